@@ -0,0 +1,131 @@
+import json
+from pathlib import Path
+from typing import Dict, List
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# NSW bounding box used for synthetic scale-ups (lon/lat)
+_WEST, _SOUTH, _EAST, _NORTH = 141.0, -37.5, 153.6, -28.2
+_STATUSES = ["Out of control", "Being controlled", "Under control", "Planned burn", ""]
+_CATEGORIES = ["Emergency Warning", "Watch and Act", "Advice", "Not Applicable"]
+_LEVELS = ["No Rating", "Moderate", "High", "Extreme", "Catastrophic"]
+
+
+# --- RFS -----------------------------------------------------------------------
+
+def recorded_rfs_feed() -> bytes:
+    """The captured incidents file, reshaped into the majorIncidents.json layout."""
+    data = json.loads((ROOT / "nsw_rfs_incidents.json").read_text(encoding="utf-8"))
+    features = []
+    for i, f in enumerate(data.get("features", [])):
+        p = f.get("properties") or {}
+        features.append({
+            "type": "Feature",
+            "geometry": f.get("geometry"),
+            "properties": {
+                "guid": f"recorded-{i}",
+                "title": p.get("title"),
+                "status": p.get("status"),
+                "category": "Advice",
+                "updated": p.get("updated") or "",
+                "link": p.get("url"),
+            },
+        })
+    return json.dumps({"type": "FeatureCollection", "features": features}).encode("utf-8")
+
+
+def synthetic_rfs_feed(n: int, seed: int = 0) -> bytes:
+    """A "bad season" majorIncidents.json with n incidents spread over NSW."""
+    rng = np.random.default_rng(seed)
+    lons = rng.uniform(_WEST, _EAST, n)
+    lats = rng.uniform(_SOUTH, _NORTH, n)
+    features = [{
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [round(float(x), 6), round(float(y), 6)]},
+        "properties": {
+            "guid": f"https://incidents.rfs.nsw.gov.au/api/v1/incidents/{500000 + i}",
+            "title": f"Synthetic Fire {i}",
+            "status": _STATUSES[i % len(_STATUSES)],
+            "category": _CATEGORIES[i % len(_CATEGORIES)],
+            "updated": f"2019-12-{1 + i % 28:02d} {i % 24:02d}:00",
+            "link": f"https://www.rfs.nsw.gov.au/fire-information/fires-near-me/{i}",
+            "size": str(int(rng.integers(1, 50000))),
+        },
+    } for i, (x, y) in enumerate(zip(lons, lats))]
+    return json.dumps({"type": "FeatureCollection", "features": features}).encode("utf-8")
+
+
+# --- BOM -----------------------------------------------------------------------
+
+def synthetic_bom_cap(n_polygons: int, vertices: int = 200, seed: int = 0) -> bytes:
+    """A CAP warnings document with n_polygons areas (one <info> per 5 areas)."""
+    rng = np.random.default_rng(seed)
+    infos = []
+    for start in range(0, n_polygons, 5):
+        areas = []
+        for j in range(start, min(start + 5, n_polygons)):
+            cx, cy = rng.uniform(_WEST + 1, _EAST - 1), rng.uniform(_SOUTH + 1, _NORTH - 1)
+            t = np.linspace(0, 2 * np.pi, vertices)
+            r = rng.uniform(0.1, 0.6) * (1 + 0.05 * np.sin(7 * t))
+            pts = " ".join(f"{cy + 0.8 * ri * np.sin(ti):.4f},{cx + ri * np.cos(ti):.4f}"
+                           for ri, ti in zip(r, t))
+            areas.append(f"<area><areaDesc>Area {j}</areaDesc><polygon>{pts}</polygon></area>")
+        infos.append(
+            "<info><event>Fire Weather</event>"
+            f"<headline>{escape(f'Severe fire danger warning {start // 5}')}</headline>"
+            "<effective>2019-12-30T09:00:00+11:00</effective>"
+            "<expires>2019-12-31T09:00:00+11:00</expires>"
+            + "".join(areas) + "</info>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<alert xmlns="urn:oasis:names:tc:emergency:cap:1.2">'
+        "<identifier>IDN21033</identifier>" + "".join(infos) + "</alert>"
+    ).encode("utf-8")
+
+
+# --- AFDRS ---------------------------------------------------------------------
+
+def recorded_afdrs_feed() -> bytes:
+    """afdrs_demo.json, reshaped into the fdrToban.json layout, plus the remaining districts."""
+    from src.location import nsw_district_names
+
+    demo = json.loads((ROOT / "afdrs_demo.json").read_text(encoding="utf-8"))
+    rows = {r["district"]: r["rating"] for r in demo.get("data", [])}
+    for i, name in enumerate(nsw_district_names()):
+        rows.setdefault(name, _LEVELS[i % len(_LEVELS)])
+    return json.dumps({"districts": [
+        {"name": k, "todays_fire_danger_rating": v} for k, v in rows.items()
+    ]}).encode("utf-8")
+
+
+# --- FIRMS ---------------------------------------------------------------------
+
+def synthetic_firms_csv(n: int, seed: int = 0) -> List[str]:
+    """VIIRS area-API CSV lines (header first) with n detections from one day."""
+    rng = np.random.default_rng(seed)
+    lines = ["latitude,longitude,bright_ti4,scan,track,acq_date,acq_time,satellite,"
+             "instrument,confidence,version,bright_ti5,frp,daynight"]
+    conf = np.array(["l", "n", "h"])[rng.integers(0, 3, n)]
+    hhmm = rng.integers(0, 24, n) * 100 + rng.integers(0, 60, n)  # valid HHMM only
+    for y, x, c, t, frp in zip(rng.uniform(_SOUTH, _NORTH, n), rng.uniform(_WEST, _EAST, n),
+                               conf, hhmm, rng.uniform(0.5, 300, n)):
+        lines.append(f"{y:.5f},{x:.5f},330.1,0.39,0.36,2019-12-31,{t:04d},N,VIIRS,"
+                     f"{c},2.0NRT,290.2,{frp:.2f},D")
+    return lines
+
+
+def gazetteer_queries() -> List[str]:
+    """Town names from the bundled gazetteer (the offline geocode path)."""
+    import csv
+
+    with open(ROOT / "nsw_gazetteer.csv", newline="", encoding="utf-8") as fh:
+        return [row["name"] for row in csv.DictReader(fh)]
+
+
+def random_points(n: int, seed: int = 1) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return {"lat": rng.uniform(_SOUTH, _NORTH, n), "lon": rng.uniform(_WEST, _EAST, n)}
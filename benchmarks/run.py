@@ -0,0 +1,315 @@
+# Offline benchmarks for the feed, risk and export hot paths.
+#
+#   python -m benchmarks.run                 # full run, table on stdout
+#   python -m benchmarks.run --quick         # fewer iterations
+#   python -m benchmarks.run -k risk         # only cases whose name contains "risk"
+#   python -m benchmarks.run --json out.json --compare baseline.json
+#
+# Every upstream is served from recorded or synthetic payloads (see
+# benchmarks/fixtures.py); nothing touches the network, and snapshots go to a
+# throwaway SQLite file.
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# isolate from the real data dir and background threads before importing src
+_TMP = tempfile.mkdtemp(prefix="oew-bench-")
+os.environ.update({
+    "SNAPSHOT_DB": os.path.join(_TMP, "snapshots.sqlite3"),
+    "ARCHIVE_DB": os.path.join(_TMP, "archive.sqlite3"),
+    "PREFETCH_DISABLED": "1",
+    "TILE_SERVER_DISABLED": "1",
+    "ARCHIVE_DISABLED": "1",
+})
+os.environ.pop("AFDRS_CUSTOM_URL", None)
+os.environ.pop("FIRMS_MAP_KEY", None)
+os.environ.pop("FIRMS_CSV_PATH", None)
+
+import numpy as np  # noqa: E402
+
+from benchmarks import fixtures  # noqa: E402
+from benchmarks.stub_http import StubHTTP  # noqa: E402
+from src import afdrs, fetch_bom, fetch_firms, fetch_rfs_nsw, risk_model  # noqa: E402
+from src.export import export_incidents  # noqa: E402
+from src.gazetteer import load_gazetteer  # noqa: E402
+
+RFS_URL = "https://www.rfs.nsw.gov.au/feeds/majorIncidents.json"
+AFDRS_URL = "https://www.rfs.nsw.gov.au/feeds/fdrToban.json"
+
+# name -> setup(); setup returns (fn, items per call)
+CASES: Dict[str, Callable[[], Tuple[Callable[[], object], int]]] = {}
+
+
+def case(name: str):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+# --- Shared state --------------------------------------------------------------
+
+_stub = StubHTTP().install()
+_payloads: Dict[str, bytes] = {}
+
+
+def _payload(key: str, build: Callable[[], bytes]) -> bytes:
+    if key not in _payloads:
+        _payloads[key] = build()
+    return _payloads[key]
+
+
+def _load_feeds(rfs: bytes, bom: bytes):
+    """Point the stub at the given payloads and prime every fetcher cache from them."""
+    _stub.route(RFS_URL, rfs)
+    _stub.route(fetch_bom.BOM_WARNINGS_URL, bom, "application/xml")
+    _stub.route(AFDRS_URL, _payload("afdrs", fixtures.recorded_afdrs_feed))
+    fetch_rfs_nsw.refresh_rfs_points()
+    fetch_bom.refresh_bom_snapshot()
+    afdrs.refresh_today_ratings()
+    fetch_firms._cache["points"] = fetch_firms.parse_firms_csv(
+        _payload_lines("firms-5k", lambda: fixtures.synthetic_firms_csv(5000)))
+
+
+_lines: Dict[str, List[str]] = {}
+
+
+def _payload_lines(key: str, build: Callable[[], List[str]]) -> List[str]:
+    if key not in _lines:
+        _lines[key] = build()
+    return _lines[key]
+
+
+def _recorded():
+    return (_payload("rfs-recorded", fixtures.recorded_rfs_feed),
+            _payload("bom-50", lambda: fixtures.synthetic_bom_cap(50)))
+
+
+def _bad_season():
+    return (_payload("rfs-10k", lambda: fixtures.synthetic_rfs_feed(10_000)),
+            _payload("bom-500", lambda: fixtures.synthetic_bom_cap(500)))
+
+
+# --- Feed fetch + parse ----------------------------------------------------------
+
+@case("rfs.refresh[recorded]")
+def _():
+    _load_feeds(*_recorded())
+    return (lambda: fetch_rfs_nsw.refresh_rfs_points()), 1
+
+
+@case("rfs.refresh[10k]")
+def _():
+    _load_feeds(*_bad_season())
+    return (lambda: fetch_rfs_nsw.refresh_rfs_points()), 10_000
+
+
+@case("bom.parse[50]")
+def _():
+    body = _recorded()[1]
+    return (lambda: fetch_bom.parse_bom_cap(body)), 50
+
+
+@case("bom.parse[500]")
+def _():
+    body = _bad_season()[1]
+    return (lambda: fetch_bom.parse_bom_cap(body)), 500
+
+
+@case("bom.refresh[500]")
+def _():
+    _load_feeds(*_bad_season())
+    return (lambda: fetch_bom.refresh_bom_snapshot()), 500
+
+
+@case("afdrs.refresh")
+def _():
+    _load_feeds(*_recorded())
+    return (lambda: afdrs.refresh_today_ratings()), 1
+
+
+@case("firms.parse[50k]")
+def _():
+    lines = _payload_lines("firms-50k", lambda: fixtures.synthetic_firms_csv(50_000))
+    return (lambda: fetch_firms.parse_firms_csv(lines)), 50_000
+
+
+# --- Risk ----------------------------------------------------------------------
+
+def _query_cycle():
+    gaz = load_gazetteer()
+    queries = [(q, (gaz.lookup(q) or None) and gaz.lookup(q).district) for q in fixtures.gazetteer_queries()]
+    state = {"i": 0}
+
+    def next_query():
+        q, d = queries[state["i"] % len(queries)]
+        state["i"] += 1
+        return q, d
+    return next_query
+
+
+@case("risk.query[recorded]")
+def _():
+    _load_feeds(*_recorded())
+    nxt = _query_cycle()
+    return (lambda: risk_model.compute_risk_for_query(*nxt())), 1
+
+
+@case("risk.query[10k]")
+def _():
+    _load_feeds(*_bad_season())
+    nxt = _query_cycle()
+    return (lambda: risk_model.compute_risk_for_query(*nxt())), 1
+
+
+@case("risk.query[10k, new snapshot]")
+def _():
+    # every call sees a fresh snapshot object, so the spatial indexes are rebuilt
+    _load_feeds(*_bad_season())
+    points = fetch_rfs_nsw._cache["points"]
+    nxt = _query_cycle()
+
+    def run():
+        fetch_rfs_nsw._cache["points"] = list(points)
+        return risk_model.compute_risk_for_query(*nxt())
+    return run, 1
+
+
+@case("risk.points[10k pts]")
+def _():
+    _load_feeds(*_bad_season())
+    pts = fixtures.random_points(10_000)
+    return (lambda: risk_model.compute_risk_for_points(pts["lat"], pts["lon"])), 10_000
+
+
+@case("bom.contains[500 polys]")
+def _():
+    _load_feeds(*_bad_season())
+    polys = fetch_bom.get_bom_polygons()
+    pts = fixtures.random_points(1000)
+    state = {"i": 0}
+
+    def run():
+        i = state["i"] = (state["i"] + 1) % 1000
+        return risk_model._any_polygon_contains(pts["lat"][i], pts["lon"][i], polys)
+    return run, 1
+
+
+# --- Export --------------------------------------------------------------------
+
+@case("export.geojson[10k, new snapshot]")
+def _():
+    _load_feeds(*_bad_season())
+    points = fetch_rfs_nsw._cache["points"]
+    return (lambda: export_incidents(list(points), 4500)), 10_000
+
+
+@case("export.geojson[10k, cached]")
+def _():
+    _load_feeds(*_bad_season())
+    points = fetch_rfs_nsw._cache["points"]
+    return (lambda: export_incidents(points, 4500)), 10_000
+
+
+@case("export.legacy[10k]")
+def _():
+    # the pre-cache Map page download: rebuild features and pretty-print per rerun
+    _load_feeds(*_bad_season())
+    points = fetch_rfs_nsw._cache["points"]
+
+    def run():
+        features = [{
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [p["lon"], p["lat"]]},
+            "properties": {
+                "title": p.get("title"),
+                "status": p.get("status") or "No official status published",
+                "updated": p.get("updated") or "",
+                "url": p.get("url"),
+                "source": "NSW RFS",
+                "color": p.get("color"),
+                "radius": p.get("radius_m", 4500),
+            },
+        } for p in points if p.get("lat") is not None and p.get("lon") is not None]
+        return json.dumps({"type": "FeatureCollection", "features": features}, indent=2)
+    return run, 10_000
+
+
+# --- Runner --------------------------------------------------------------------
+
+def measure(fn: Callable[[], object], min_iters: int, max_seconds: float) -> List[float]:
+    fn()  # warm-up (imports, first index build)
+    samples: List[float] = []
+    start = time.perf_counter()
+    while len(samples) < min_iters or (time.perf_counter() - start < max_seconds and len(samples) < 10_000):
+        t = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t)
+    return samples
+
+
+def summarise(samples: List[float], items: int) -> Dict[str, float]:
+    a = np.asarray(samples)
+    mean = float(a.mean())
+    return {
+        "n": len(a),
+        "mean_ms": mean * 1e3,
+        "p50_ms": float(np.percentile(a, 50)) * 1e3,
+        "p95_ms": float(np.percentile(a, 95)) * 1e3,
+        "p99_ms": float(np.percentile(a, 99)) * 1e3,
+        "ops_s": 1.0 / mean if mean else float("inf"),
+        "items_s": items / mean if mean else float("inf"),
+    }
+
+
+def _table(results: Dict[str, Dict[str, float]], baseline: Optional[Dict] = None) -> str:
+    head = f"{'case':36s} {'n':>6s} {'p50 ms':>10s} {'p95 ms':>10s} {'p99 ms':>10s} {'ops/s':>10s} {'items/s':>12s}"
+    if baseline:
+        head += f" {'p50 vs base':>12s}"
+    out = [head, "-" * len(head)]
+    for name, r in results.items():
+        line = (f"{name:36s} {r['n']:6d} {r['p50_ms']:10.3f} {r['p95_ms']:10.3f} {r['p99_ms']:10.3f} "
+                f"{r['ops_s']:10.1f} {r['items_s']:12.0f}")
+        if baseline:
+            base = baseline.get(name)
+            line += f" {r['p50_ms'] / base['p50_ms'] - 1:+11.1%}" if base and base["p50_ms"] else f" {'n/a':>12s}"
+        out.append(line)
+    return "\n".join(out)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Offline benchmarks (network stubbed).")
+    ap.add_argument("-k", default="", help="only run cases whose name contains this")
+    ap.add_argument("--quick", action="store_true", help="fewer iterations (smoke run)")
+    ap.add_argument("--seconds", type=float, default=2.0, help="time budget per case")
+    ap.add_argument("--json", help="write results to this file")
+    ap.add_argument("--compare", help="baseline results JSON to compare p50 against")
+    args = ap.parse_args(argv)
+
+    min_iters, seconds = (3, 0.3) if args.quick else (20, args.seconds)
+    results = {}
+    for name, setup in CASES.items():
+        if args.k and args.k not in name:
+            continue
+        fn, items = setup()
+        results[name] = summarise(measure(fn, min_iters, seconds), items)
+        print(f"  {name}: p50 {results[name]['p50_ms']:.3f} ms", file=sys.stderr)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)["results"]
+    print(_table(results, baseline))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"at": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+import json
+from typing import Dict, Optional, Tuple
+
+from src import http_client
+
+
+class FakeResponse:
+    """Just enough of requests.Response for the fetchers."""
+
+    def __init__(self, body: bytes, content_type: str = "application/json", status: int = 200):
+        self.content = body
+        self.status_code = status
+        self.headers = {"Content-Type": content_type}
+        self.encoding = "utf-8"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def iter_lines(self, decode_unicode: bool = False):
+        for line in self.content.splitlines():
+            yield line.decode("utf-8") if decode_unicode else line
+
+    def close(self):
+        pass
+
+
+class StubHTTP:
+    """
+    Replaces http_client.get with a prefix -> payload table; anything
+    unmatched gets a 404, so a benchmark can never reach the network.
+    """
+
+    def __init__(self):
+        self.routes: Dict[str, Tuple[bytes, str]] = {}
+        self._original = None
+
+    def route(self, url_prefix: str, body: bytes, content_type: str = "application/json"):
+        self.routes[url_prefix] = (body, content_type)
+
+    def get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+            timeout: float = 10, conditional: bool = True, stream: bool = False,
+            source: Optional[str] = None) -> FakeResponse:
+        for prefix, (body, ctype) in self.routes.items():
+            if url.startswith(prefix):
+                return FakeResponse(body, ctype)
+        return FakeResponse(b"[]", status=404)
+
+    def install(self) -> "StubHTTP":
+        self._original = http_client.get
+        http_client.get = self.get
+        return self
+
+    def uninstall(self):
+        if self._original is not None:
+            http_client.get = self._original
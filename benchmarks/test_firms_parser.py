@@ -0,0 +1,72 @@
+# parse_firms_csv against small VIIRS and MODIS area CSVs (benchmarks/data).
+#
+#   python -m pytest benchmarks/test_firms_parser.py
+import datetime as dt
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pytest
+
+from src.fetch_firms import parse_firms_csv
+
+DATA = Path(__file__).resolve().parent / "data"
+JAN_10 = dt.datetime(2026, 1, 10, tzinfo=dt.timezone.utc).timestamp()
+
+
+def _lines(name: str) -> List[str]:
+    return (DATA / name).read_text(encoding="utf-8").splitlines()
+
+
+def test_viirs_confidence_letters():
+    h = parse_firms_csv(_lines("firms_viirs.csv"))
+    # "l" is below MIN_CONFIDENCE; n / h / nominal survive
+    assert h.confidence.tolist() == [55, 90, 55, 55]
+    assert len(parse_firms_csv(_lines("firms_viirs.csv"), min_confidence=0)) == 5
+    assert len(parse_firms_csv(_lines("firms_viirs.csv"), min_confidence=60)) == 1
+
+
+def test_viirs_rows_and_times():
+    h = parse_firms_csv(_lines("firms_viirs.csv"))
+    np.testing.assert_allclose(h.lat, [-33.71234, -34.05120, -35.10003, -32.50550])
+    np.testing.assert_allclose(h.frp, [12.41, 45.02, 3.25, 0.0], rtol=1e-6)  # blank frp -> 0
+    assert h.acq_time[0] == JAN_10 + 3 * 3600 + 42 * 60
+    assert h.acq_time[2] == JAN_10 - 70 * 60  # 2026-01-09 22:50
+
+
+def test_since_window():
+    h = parse_firms_csv(_lines("firms_viirs.csv"), since=JAN_10)
+    assert len(h) == 3
+    assert (h.acq_time >= JAN_10).all()
+    assert len(parse_firms_csv(_lines("firms_viirs.csv"), since=JAN_10 + 16 * 3600)) == 0
+
+
+def test_modis_numeric_confidence():
+    h = parse_firms_csv(_lines("firms_modis.csv"))
+    # 20 is dropped, 30 is kept at the threshold, "abc" and a bad date are malformed
+    assert h.confidence.tolist() == [85, 30]
+    np.testing.assert_allclose(h.lon, [152.1103, 151.6004])
+    assert len(parse_firms_csv(_lines("firms_modis.csv"), min_confidence=50)) == 1
+
+
+def test_malformed_rows_skipped():
+    lines = _lines("firms_viirs.csv")[:1] + ["", "garbage", "-33.9,151.0,,,,2026-01-10,xx42"]
+    assert len(parse_firms_csv(lines)) == 0
+
+
+def test_empty_input():
+    assert len(parse_firms_csv([])) == 0
+    assert len(parse_firms_csv(_lines("firms_modis.csv")[:1])) == 0
+
+
+@pytest.mark.parametrize("drop", ["latitude", "acq_time"])
+def test_missing_header_column(drop):
+    header, *rows = _lines("firms_viirs.csv")
+    header = header.replace(drop, "unused")
+    with pytest.raises(ValueError, match=drop):
+        parse_firms_csv([header] + rows)
+
+
+def test_error_body_is_not_a_csv():
+    with pytest.raises(ValueError, match="latitude"):
+        parse_firms_csv(["Invalid MAP_KEY."])
@@ -0,0 +1,81 @@
+# Conditional-GET behaviour of http_client.get against a local HTTP server.
+#
+#   python -m pytest benchmarks/test_http_client.py
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+import pytest
+
+from src import http_client
+
+ETAG = '"v1"'
+BODY = b'{"features": []}'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # every request's headers, in arrival order
+    seen: List[Dict[str, str]] = []
+
+    def do_GET(self):
+        self.seen.append({k.lower(): v for k, v in self.headers.items()})
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    _Handler.seen = []
+    http_client._validated.clear()
+    yield f"http://127.0.0.1:{srv.server_address[1]}/feed.json"
+    srv.shutdown()
+    srv.server_close()
+    http_client._validated.clear()
+
+
+def test_304_reuses_cached_response(server):
+    first = http_client.get(server)
+    second = http_client.get(server)
+    assert first.status_code == 200 and first.content == BODY
+    assert second is first
+    assert second.content == BODY
+    assert "if-none-match" not in _Handler.seen[0]
+    assert _Handler.seen[1]["if-none-match"] == ETAG
+
+
+def test_304_without_cached_response_refetches(server):
+    http_client.get(server)
+    http_client._validated.clear()  # validator evicted; the caller still sends one
+    resp = http_client.get(server, headers={"If-None-Match": ETAG})
+    assert resp.status_code == 200 and resp.content == BODY
+    assert len(_Handler.seen) == 3
+    retry = _Handler.seen[2]
+    assert "if-none-match" not in retry
+    assert retry["cache-control"] == "no-cache"
+
+
+def test_stream_bypasses_cache(server):
+    for _ in range(2):
+        resp = http_client.get(server, stream=True)
+        try:
+            assert resp.status_code == 200
+            assert b"".join(resp.iter_content(1024)) == BODY
+        finally:
+            resp.close()
+    assert all("if-none-match" not in h for h in _Handler.seen)
+    assert len(http_client._validated) == 0
@@ -2,6 +2,7 @@ import streamlit as st
 
 from src.location import geocode_nominatim, detect_district, nsw_district_names
 from src.afdrs import get_today_rating_for_district
+from src.alerts import get_subscription_store
 from src.risk_model import compute_risk_for_query
 from src.ui_text import actions_for_afdrs, explain_badges
 from src.sidebar import render_sidebar
@@ -60,4 +61,16 @@ if q.strip():
     for t in res.tags:
         st.write("•", t)
 else:
-    st.caption("Enter a town/postcode above to see a risk score prototype.")
\ No newline at end of file
+    st.caption("Enter a town/postcode above to see a risk score prototype.")
+
+# --- Alerts for this location ---
+st.subheader("🔔 Watch this location")
+radius = st.slider("Alert radius (km)", 5, 100, 25, step=5)
+if st.button("Watch for new incidents and warnings"):
+    geo = geocode_nominatim(q.strip()) if q.strip() else None
+    if geo:
+        lat, lon, name = geo
+        get_subscription_store().add(lat, lon, radius, selected_district, label=name)
+        st.success(f"Watching **{name}** ({radius} km). Alerts are written to the alerts outbox.")
+    else:
+        st.error("Enter a town/postcode above first.")
@@ -1,12 +1,16 @@
 import streamlit as st 
 import pydeck as pdk
-import json
 import datetime as dt
+import time
 
-from src.fetch_rfs_nsw import get_rfs_points
+from src.fetch_rfs_nsw import get_rfs_points, get_rfs_changes
 from src.fetch_bom import get_bom_polygons
 from src.fetch_firms import get_firms_points
-from src.geo_utils import to_pydeck_layer_polygons
+from src.export import export_incidents
+from src.geo_utils import CompactDeck, to_pydeck_layer_polygons
+from src.map_lod import VIEWS, bbox_for_view, bom_view, hotspot_view, points_in_view, rfs_view
+from src.replay import get_replay
+from src.tile_server import start_tile_server, tile_url_template
 from src.sidebar import render_sidebar
 render_sidebar()
 
@@ -33,73 +37,168 @@ with col4:
 with col5:
     radius_m = st.slider("Marker size", min_value=2000, max_value=8000, value=4500, step=500)
 
+# only the chosen region is sent to the browser, at a detail level matching its zoom
+region = st.selectbox("Region", list(VIEWS))
+view_lat, view_lon, view_zoom = VIEWS[region]
+view_zoom = st.slider("Detail (zoom)", min_value=4.0, max_value=12.0, value=float(view_zoom), step=0.5)
+bbox = bbox_for_view(view_lat, view_lon, view_zoom)
+# with tiles the browser fetches only visible z/x/y tiles from the tile server
+use_tiles = st.checkbox("Stream incidents and warnings as vector tiles", False,
+                        disabled=start_tile_server() is None)
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Replay (archive time-slider)
+# ───────────────────────────────────────────────────────────────────────────────
+REPLAY_WINDOWS = {"Last 24 hours": 1, "Last 3 days": 3, "Last 7 days": 7, "Last 14 days": 14}
+REPLAY_STEPS = {"30 min": 1800, "1 hour": 3600, "3 hours": 10800}
+
+if st.toggle("⏪ Replay from archive", False):
+    rc1, rc2, rc3 = st.columns([2, 1, 1])
+    with rc1:
+        window_days = REPLAY_WINDOWS[st.selectbox("Window", list(REPLAY_WINDOWS))]
+    with rc2:
+        step_s = REPLAY_STEPS[st.selectbox("Step", list(REPLAY_STEPS), index=1)]
+    with rc3:
+        playing = st.toggle("▶ Play", False)
+
+    now = time.time()
+    # frames are built once per window/step; scrubbing only swaps prebuilt layer data
+    replay = get_replay(now - window_days * 86400, now, step_s)
+
+    def _replay_layers(frame):
+        out = []
+        if show_bom and frame.warnings:
+            out += to_pydeck_layer_polygons(frame.warnings, name="BOM Warnings")
+        if show_firms and len(frame.hotspots):
+            out.append(pdk.Layer("HeatmapLayer", id="replay-hotspots", data=frame.hotspots,
+                                 get_position='[lon, lat]', get_weight='weight',
+                                 aggregation='MEAN', opacity=0.4))
+        if show_rfs and len(frame.incidents):
+            out.append(pdk.Layer("ScatterplotLayer", id="replay-incidents", data=frame.incidents,
+                                 get_position='[lon, lat]', get_radius=radius_m, filled=True,
+                                 pickable=True, get_fill_color='[r, g, b]',
+                                 get_line_color=[30, 30, 30], line_width_min_pixels=1))
+        return out
+
+    # only this fragment reruns per tick/scrub, not the whole page
+    @st.fragment(run_every=0.75 if playing else None)
+    def _replay_player():
+        if playing:
+            st.session_state["replay_idx"] = (st.session_state.get("replay_idx", 0) + 1) % len(replay)
+        elif st.session_state.get("replay_idx", 0) >= len(replay):
+            st.session_state["replay_idx"] = 0
+        idx = st.slider("Frame", 0, len(replay) - 1, key="replay_idx")
+        frame = replay.frames[idx]
+        when = dt.datetime.utcfromtimestamp(frame.t).strftime("%Y-%m-%d %H:%M UTC")
+        st.caption(f"**{when}** • incidents: **{len(frame.incidents)}** • "
+                   f"BOM polygons: **{len(frame.warnings)}** • hotspots: **{len(frame.hotspots)}**")
+        st.pydeck_chart(CompactDeck(
+            map_provider="carto",
+            map_style="light",
+            initial_view_state=pdk.ViewState(latitude=view_lat, longitude=view_lon, zoom=view_zoom),
+            layers=_replay_layers(frame),
+            tooltip={"html": "<b>{title}</b><br>Status: {status}<br>Updated: {updated}",
+                     "style": {"backgroundColor": "white", "color": "black"}},
+        ), key="replay_deck")
+
+    _replay_player()
+    st.stop()
+
 # ───────────────────────────────────────────────────────────────────────────────
 # Fetch data
 # ───────────────────────────────────────────────────────────────────────────────
 rfs_points = get_rfs_points()
 bom_polys = get_bom_polygons()
-firms_points = get_firms_points() if show_firms else None
+firms_points = get_firms_points() if show_firms else None  # columnar Hotspots
+
+changes = get_rfs_changes()
+
+# columnar, pre-styled frame (a per-call copy of the cached view)
+rfs_visible = rfs_view(rfs_points, bbox, view_zoom)
+bom_visible = bom_view(bom_polys, bbox, view_zoom) if bom_polys else []
 
 st.caption(f"Incidents: **{len(rfs_points)}** • BOM polygons: **{len(bom_polys)}**")
+if changes:
+    st.caption(
+        f"Since last refresh: **{len(changes.new)}** new • **{len(changes.escalated)}** escalated • "
+        f"**{len(changes.closed)}** closed (new/escalated incidents are ringed)"
+    )
 
 # ───────────────────────────────────────────────────────────────────────────────
 # Prep layers
 # ───────────────────────────────────────────────────────────────────────────────
 layers = []
 
-def _apply_point_styles(records, radius_value):
-    styled = []
-    for r in records:
-        s = (r.get("status") or "").strip().lower()
-        title = (r.get("title") or "").lower()
-
-        # heuristics
-        if "out of control" in s:
-            color = [230, 57, 70]          # red
-        elif "being controlled" in s or "contained" in s:
-            color = [255, 165, 0]          # orange
-        elif "burn" in s or "burn" in title:
-            color = [66, 135, 245]         # blue (planned burn / burn activity)
-        elif not s or "no official status" in s or s == "unknown":
-            color = [128, 128, 128]        # grey
-        else:
-            color = [34, 139, 34]          # green (advice/other)
-
-        r["color"] = color
-        r["radius_m"] = radius_value
-        styled.append(r)
-    return styled
-
 # NSW RFS incidents
-if show_rfs and rfs_points:
-    styled_points = _apply_point_styles(list(rfs_points), radius_m)
+if show_rfs and use_tiles:
+    layers.append(
+        pdk.Layer(
+            "MVTLayer",
+            data=tile_url_template("rfs"),
+            point_type="circle",
+            get_point_radius=radius_m,
+            point_radius_units="meters",
+            get_fill_color='[properties.r, properties.g, properties.b]',  # status colour, as below
+            get_line_color=[30, 30, 30],
+            line_width_min_pixels=1,
+            pickable=True,
+        )
+    )
+elif show_rfs and len(rfs_visible):
     layers.append(
         pdk.Layer(
             "ScatterplotLayer",
-            data=styled_points,
+            data=rfs_visible,
             get_position='[lon, lat]',
-            get_radius='radius_m',
+            get_radius=radius_m,
             filled=True,
             pickable=True,
-            get_fill_color='color',
+            get_fill_color='[r, g, b]',
             get_line_color=[30, 30, 30],
             line_width_min_pixels=1,
         )
     )
 
+    # ring new / escalated incidents from the latest diff that fall in the view
+    flagged = points_in_view(changes.new + changes.escalated, bbox)
+    if flagged:
+        layers.append(
+            pdk.Layer(
+                "ScatterplotLayer",
+                data=flagged,
+                get_position='[lon, lat]',
+                get_radius=radius_m * 1.8,
+                filled=False,
+                stroked=True,
+                get_line_color=[200, 0, 120],
+                line_width_min_pixels=2,
+            )
+        )
+
 # BOM polygons
-if show_bom and bom_polys:
-    layers += to_pydeck_layer_polygons(bom_polys, name="BOM Warnings")
+if show_bom and use_tiles:
+    layers.append(
+        pdk.Layer(
+            "MVTLayer",
+            data=tile_url_template("bom"),
+            get_fill_color=[255, 140, 0, 80],
+            get_line_color=[50, 50, 50],
+            stroked=True,
+            pickable=True,
+        )
+    )
+elif show_bom and bom_visible:
+    layers += to_pydeck_layer_polygons(bom_visible, name="BOM Warnings")
 
 # FIRMS hotspots
 if show_firms and firms_points:
     layers.append(
         pdk.Layer(
             "HeatmapLayer",
-            data=firms_points,
+            data=hotspot_view(firms_points, bbox, view_zoom),
             get_position='[lon, lat]',
             get_weight='weight',
-            aggregation='MEAN',
+            aggregation='SUM',  # bins already hold summed FRP; MEAN would undo that
             opacity=0.4
         )
     )
@@ -107,9 +206,10 @@ if show_firms and firms_points:
 # ───────────────────────────────────────────────────────────────────────────────
 # Map render
 # ───────────────────────────────────────────────────────────────────────────────
-initial_view = pdk.ViewState(latitude=-32.5, longitude=147.0, zoom=5)
+initial_view = pdk.ViewState(latitude=view_lat, longitude=view_lon, zoom=view_zoom)
 
-deck = pdk.Deck(
+# compact JSON: the deck spec is resent to the browser on every rerun
+deck = CompactDeck(
     map_provider="carto",
     map_style="light",
     initial_view_state=initial_view,
@@ -130,34 +230,9 @@ st.caption(
 # Export incidents (GeoJSON-like)
 # ───────────────────────────────────────────────────────────────────────────────
 if rfs_points:
-    features = []
-    for p in rfs_points:
-        lat, lon = p.get("lat"), p.get("lon")
-        if lat is None or lon is None:
-            continue
-        features.append({
-            "type": "Feature",
-            "geometry": {"type": "Point", "coordinates": [lon, lat]},
-            "properties": {
-                "title": p.get("title"),
-                "status": p.get("status") or "No official status published",
-                "updated": p.get("updated") or "",
-                "url": p.get("url"),
-                "source": "NSW RFS",
-                "color": p.get("color"),
-                "radius": p.get("radius_m", radius_m)
-            }
-        })
-
-    payload = {
-        "type": "FeatureCollection",
-        "generated_at_utc": dt.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-        "features": features
-    }
-
     st.download_button(
         "⬇️ Download incidents (GeoJSON-like)",
-        data=json.dumps(payload, indent=2),
+        data=export_incidents(rfs_points, radius_m).data,
         file_name="nsw_rfs_incidents.json",
         mime="application/json"
     )
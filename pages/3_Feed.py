@@ -1,68 +1,71 @@
 import streamlit as st
-from datetime import datetime
 
-from src.fetch_rfs_nsw import get_rfs_feed
-from src.fetch_bom import get_bom_feed
+from src.fetch_rfs_nsw import get_rfs_points, get_rfs_changes
+from src.fetch_bom import BomSnapshot, get_bom_snapshot
+from src.feed_index import CATEGORIES, get_feed_index, page_count
+from src.concurrent_fetch import fetch_all
 from src.sidebar import render_sidebar
 render_sidebar()
 
 st.header("📰 Unified Feed")
 
+PAGE_SIZE = 25
+
 # ───────────────────────────────────────────────────────────────────────────────
-# Fetch + merge
+# Fetch + index
 # ───────────────────────────────────────────────────────────────────────────────
-rfs_feed = get_rfs_feed()      # Bushfire incidents
-bom_feed = get_bom_feed()      # BOM warnings
-combined = rfs_feed + bom_feed
-
-def _key_time(item):
-    return item.get("time") or ""
-
-def _fmt(ts: str) -> str:
-    """Convert ISO timestamps like 2025-09-27T12:34:00Z to human UTC string."""
-    try:
-        return datetime.fromisoformat(ts.replace("Z", "+00:00")).strftime("%Y-%m-%d %H:%M UTC")
-    except Exception:
-        return ts or ""
+# Both feeds are fetched in parallel; a slow source drops out with a notice
+fetched = fetch_all(
+    {"NSW RFS": get_rfs_points, "BOM": get_bom_snapshot},   # Bushfire incidents, BOM warnings
+    deadline=12.0,
+    defaults={"NSW RFS": [], "BOM": BomSnapshot()},
+)
+for source, status in fetched.degraded.items():
+    st.warning(f"{source} feed unavailable right now ({status}); showing other sources.")
+# merged, time-parsed and keyword-indexed once per snapshot; reruns only slice it
+index = get_feed_index(fetched.results["NSW RFS"], fetched.results["BOM"])
 
-# Sort newest first
-combined = sorted(combined, key=_key_time, reverse=True)
+# What changed in the RFS feed since the previous refresh
+changes = get_rfs_changes()
+new_ids, escalated_ids = changes.guids("new"), changes.guids("escalated")
+if changes:
+    st.caption(
+        f"Since last refresh: **{len(changes.new)}** new • **{len(changes.escalated)}** escalated • "
+        f"**{len(changes.updated)}** updated • **{len(changes.closed)}** closed"
+    )
 
 # ───────────────────────────────────────────────────────────────────────────────
 # Filter control
 # ───────────────────────────────────────────────────────────────────────────────
-filter_opt = st.selectbox("Filter", ["All", "Bushfire", "Flood", "Severe Weather"], index=0)
+c1, c2 = st.columns([1, 2])
+filter_opt = c1.selectbox("Filter", ["All", *CATEGORIES], index=0)
+query = c2.text_input("Search", placeholder="e.g. Gospers, flood, Blue Mountains")
 
-def _passes_filter(item, f):
-    if f == "All":
-        return True
-    title = (item.get("title") or "").lower()
-    summary = (item.get("summary") or "").lower()
-    txt = f"{title} {summary}"
-    if f == "Bushfire":
-        return ("fire" in txt) or ("bushfire" in txt) or ("nsw rfs" in txt)
-    if f == "Flood":
-        return "flood" in txt
-    if f == "Severe Weather":
-        return ("storm" in txt) or ("severe" in txt) or ("wind" in txt) or ("weather" in txt)
-    return True
-
-visible = [x for x in combined if _passes_filter(x, filter_opt)]
+# a new filter or search starts again from the first page
+if st.session_state.get("feed_filter") != (filter_opt, query):
+    st.session_state["feed_filter"] = (filter_opt, query)
+    st.session_state["feed_page"] = 1
+matches = index.positions(filter_opt, query)  # computed once; pages are slices of it
+total_pages = page_count(len(matches), PAGE_SIZE)
+# the feed can shrink between refreshes
+st.session_state["feed_page"] = min(st.session_state.get("feed_page", 1), total_pages)
 
 # ───────────────────────────────────────────────────────────────────────────────
 # Render
 # ───────────────────────────────────────────────────────────────────────────────
-if not visible:
+page_no = st.number_input("Page", min_value=1, max_value=total_pages, step=1, key="feed_page")
+page = index.paginate(matches, int(page_no) - 1, PAGE_SIZE)
+
+if not page.items:
     st.info("No items match this filter yet.")
 else:
-    for item in visible[:200]:
-        title = item.get("title", "Untitled")
-        time_str = _fmt(item.get("time", ""))
+    st.caption(f"{page.total} items • page {page.page + 1} of {page.pages}")
+    for item in page.items:
         # Friendly fallback for status/summary
-        summary = item.get("summary") or "No official status published"
-        url = item.get("url")
+        summary = item.summary or "No official status published"
+        badge = "🆕 " if item.guid in new_ids else "⬆️ " if item.guid in escalated_ids else ""
 
-        with st.expander(f"{time_str} • {title}"):
+        with st.expander(f"{badge}{item.time_label} • {item.title}"):
             st.write(summary)
-            if url:
-                st.markdown(f"[Official link]({url})")
\ No newline at end of file
+            if item.url:
+                st.markdown(f"[Official link]({item.url})")
@@ -1,52 +1,30 @@
-import json
 import re
-import datetime as dt
 import streamlit as st
 from streamlit.components.v1 import html as st_html
 
 from src.sidebar import render_sidebar
-from src.fetch_rfs_nsw import get_rfs_points
+from src.export import export_incidents
+from src.export_formats import FORMATS, LAYERS, export_layer
+from src.tile_server import start_tile_server, tile_url_template
 
 render_sidebar()
 
 st.header("🧭 ArcGIS View")
 st.caption("Export incidents for ArcGIS Online and embed a live ArcGIS map. Paste a Web Map ID/URL or a Hosted Feature Layer / GeoJSON URL.")
 
-# Build ArcGIS-ready GeoJSON (skip null coords + timestamp)
-rfs_points = get_rfs_points() or []
-features = []
-for p in rfs_points:
-    lat, lon = p.get("lat"), p.get("lon")
-    if lat is None or lon is None:
-        continue
-    features.append({
-        "type": "Feature",
-        "geometry": {"type": "Point", "coordinates": [float(lon), float(lat)]},
-        "properties": {
-            "title": p.get("title"),
-            "status": p.get("status") or "No official status published",
-            "updated": p.get("updated") or "",
-            "url": p.get("url"),
-            "source": p.get("source") or "NSW RFS"
-        }
-    })
-
-payload = {
-    "type": "FeatureCollection",
-    "generated_at_utc": dt.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-    "features": features
-}
-
+# ArcGIS-ready GeoJSON (skips null coords); serialised once per RFS snapshot
 left, right = st.columns([2, 1], vertical_alignment="center")
 with left:
     st.subheader("Export incidents (GeoJSON)")
     st.caption("Upload this file to ArcGIS Online and add it to a Web Map.")
-    st.write(f"Features ready: **{len(features)}**")
+    compress = st.checkbox("Compress (gzip)", False)
+    export = export_incidents(gz=compress)
+    st.write(f"Features ready: **{export.feature_count}**")
     st.download_button(
         "⬇️ Download incidents (GeoJSON-like)",
-        data=json.dumps(payload, indent=2),
-        file_name="nsw_rfs_incidents.json",
-        mime="application/json",
+        data=export.data,
+        file_name="nsw_rfs_incidents.json.gz" if compress else "nsw_rfs_incidents.json",
+        mime="application/gzip" if compress else "application/json",
         use_container_width=True
     )
 
@@ -54,6 +32,33 @@ with right:
     st.subheader("Color key")
     st.caption("Red = Out of control\n\nOrange = Being controlled\n\nGreen = Other/Advice")
 
+with st.expander("GIS formats (GeoJSONSeq, FlatGeobuf, GeoParquet)"):
+    st.caption("Line-delimited, spatially indexed or columnar files for analytics pipelines.")
+    c1, c2 = st.columns(2)
+    with c1:
+        gis_layer = st.selectbox("Layer", LAYERS)
+    with c2:
+        gis_format = st.selectbox("Format", list(FORMATS))
+    ext, mime = FORMATS[gis_format]
+    try:
+        blob = export_layer(gis_layer, gis_format)
+        st.download_button(
+            f"⬇️ Download {gis_layer} ({blob.feature_count} features)",
+            data=blob.data,
+            file_name=f"nsw_{gis_layer}{ext}",
+            mime=mime,
+            use_container_width=True
+        )
+    except Exception as e:
+        st.warning(f"Export unavailable right now: {e}")
+
+if start_tile_server() is not None:
+    with st.expander("Live vector tiles (MVT)"):
+        st.caption("Add these as vector tile layers in QGIS, MapLibre or deck.gl; tiles follow the current snapshot.")
+        for name, layer in (("Incidents", "rfs"), ("BOM warnings", "bom"), ("Hotspots", "firms")):
+            st.write(f"**{name}**")
+            st.code(tile_url_template(layer), language=None)
+
 st.divider()
 st.subheader("Embed an ArcGIS map (live)")
 st.caption("Option A: paste a Web Map ID or a Map Viewer URL with ?webmap=…  •  Option B: paste a Hosted Feature Layer / GeoJSON URL.")
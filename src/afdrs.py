@@ -1,13 +1,17 @@
 from dataclasses import dataclass
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterable
 import os
 import csv
+import re
 from io import StringIO
 
-import requests
 from cachetools import TTLCache
 
-from src.utils_cache import update_cache_time
+from src import http_client, metrics
+from src.snapshot_store import load_snapshot, save_snapshot
+from src.utils_cache import update_cache_time, single_flight, memo_per_snapshot, notify_refresh
+
+SOURCE = "AFDRS ratings"
 
 
 # --- Public API --------------------------------------------------------------
@@ -27,7 +31,28 @@ def get_today_ratings() -> Dict[str, str]:
     Always updates the cache timestamp so your Home badge shows freshness.
     """
     if "ratings" in _CACHE:
+        metrics.cache_lookup("afdrs", True)
         return _CACHE["ratings"]
+    metrics.cache_lookup("afdrs", False)
+    with single_flight(SOURCE):
+        if "ratings" in _CACHE:
+            return _CACHE["ratings"]
+        return refresh_today_ratings(reuse_within=_CACHE.ttl)
+
+
+def refresh_today_ratings(reuse_within: float = 0) -> Dict[str, str]:
+    """
+    Fetch ratings now and replace the cached mapping (keeps the old one on error).
+    A disk snapshot younger than reuse_within seconds is adopted instead.
+    """
+    global _last_good
+    saved = load_snapshot(SOURCE, max_age_s=reuse_within) if reuse_within else None
+    if saved is not None:
+        ratings, fetched_at = saved
+        update_cache_time(SOURCE, fetched_at)
+        _CACHE["ratings"] = _last_good = ratings
+        notify_refresh(SOURCE, ratings)
+        return ratings
 
     ratings: Dict[str, str] = {}
     try:
@@ -36,33 +61,98 @@ def get_today_ratings() -> Dict[str, str]:
         if not ratings:
             # 2) Try NSW RFS JSON
             ratings = _try_fetch_rfs_json()
+        save_snapshot(SOURCE, ratings)
+        _last_good = ratings
     except Exception as e:
+        metrics.inc("feed_errors_total", source=SOURCE)
         print("AFDRS fetch error:", e)
-        ratings = {}
+        ratings = _last_good if _last_good is not None else {}
 
     _CACHE["ratings"] = ratings
-    update_cache_time("AFDRS ratings")
+    update_cache_time(SOURCE)
+    notify_refresh(SOURCE, ratings)
     return ratings
 
 
 def get_today_rating_for_district(district: str) -> Rating:
     """
-    Fuzzy matches the provided district string against the loaded ratings.
+    Matches the provided district string against the loaded ratings via a
+    normalised index (canonical key, then aliases, then best token overlap).
     Returns a Rating("Unknown") if no match is found.
     """
-    ratings = get_today_ratings()
     if not district:
         return Rating("Unknown")
-
-    dl = district.lower().strip()
-    best = None
-    for name, lvl in ratings.items():
-        nl = name.lower()
-        if dl in nl or nl in dl:
-            best = lvl
-            break
-
-    return Rating(best or "Unknown")
+    return Rating(rating_index().match(district) or "Unknown")
+
+
+def get_today_ratings_for_districts(districts: Iterable[str]) -> Dict[str, Rating]:
+    """Bulk lookup: { district -> Rating } for every distinct input name."""
+    index = rating_index()
+    return {d: Rating(index.match(d) or "Unknown") for d in set(districts) if d}
+
+
+# --- District name index -----------------------------------------------------
+
+# words that vary between feeds without changing which district is meant
+_FILLER = {"region", "district", "fire", "weather", "area", "the", "nsw"}
+_EXPAND = {"n": "northern", "s": "southern", "nth": "northern", "sth": "southern", "&": "and"}
+
+# canonical keys that name the same district in different feeds
+_ALIASES = [
+    {"northern rivers", "far north coast"},
+    {"monaro alpine", "snowy mountains"},
+    {"new england and northern tablelands", "new england", "northern tablelands"},
+    {"upper central west plains", "upper central west"},
+    {"lower central west plains", "lower central west"},
+]
+
+
+def district_key(name: str) -> str:
+    """Canonical form of a district name: 'Greater Sydney Region' -> 'greater sydney'."""
+    t = re.sub(r"[^a-z0-9&]+", " ", (name or "").lower())
+    tokens = [_EXPAND.get(tok, tok) for tok in t.split()]
+    return " ".join(tok for tok in tokens if tok not in _FILLER)
+
+
+class _RatingIndex:
+    """Built once per ratings snapshot; lookups are dict reads after the first miss."""
+
+    def __init__(self, ratings: Dict[str, str]):
+        self._by_key: Dict[str, str] = {}
+        # sorted so ties always resolve the same way
+        for name in sorted(ratings):
+            self._by_key.setdefault(district_key(name), ratings[name])
+        for group in _ALIASES:
+            hit = next((self._by_key[k] for k in sorted(group) if k in self._by_key), None)
+            if hit is not None:
+                for k in group:
+                    self._by_key.setdefault(k, hit)
+        self._tokens = [(set(k.split()), k) for k in sorted(self._by_key)]
+        self._memo: Dict[str, Optional[str]] = {}
+
+    def match(self, district: str) -> Optional[str]:
+        if district in self._memo:
+            return self._memo[district]
+        key = district_key(district)
+        level = self._by_key.get(key)
+        if level is None and key:
+            # best token overlap (Jaccard >= 0.5); earliest key wins ties
+            want = set(key.split())
+            best, best_score = None, 0.5
+            for toks, k in self._tokens:
+                score = len(want & toks) / len(want | toks)
+                if score > best_score or (score == best_score and best is None):
+                    best, best_score = k, score
+            level = self._by_key.get(best) if best else None
+        self._memo[district] = level
+        return level
+
+
+def rating_index(ratings: Optional[Dict[str, str]] = None) -> _RatingIndex:
+    """Name index over a ratings mapping (the cached one by default), built once per snapshot."""
+    if ratings is None:
+        ratings = get_today_ratings()
+    return memo_per_snapshot("afdrs:index", ratings, _RatingIndex)
 
 
 # --- Internal helpers --------------------------------------------------------
@@ -70,6 +160,9 @@ def get_today_rating_for_district(district: str) -> Rating:
 # TTL: cache one object (the dict) for 60 minutes
 _CACHE = TTLCache(maxsize=1, ttl=3600)
 
+# last successful mapping; outlives the TTL so a failed refresh can fall back to it
+_last_good: Optional[Dict[str, str]] = None
+
 # Normalize to Title Case used in UI
 _RATING_NORMALIZE = {
     "no rating": "No Rating",
@@ -105,10 +198,14 @@ def _try_fetch_custom_source() -> Dict[str, str]:
     if not url:
         return {}
 
-    headers = {"User-Agent": "Outback_Early_Warning"}
-    r = requests.get(url, timeout=10, headers=headers)
+    r = http_client.get(url, timeout=10, source=SOURCE)
     r.raise_for_status()
+    with metrics.timer("feed_parse_seconds", source=SOURCE):
+        return _parse_custom_response(r)
+
 
+def _parse_custom_response(r) -> Dict[str, str]:
+    """{ district -> rating } from an AFDRS_CUSTOM_URL response (JSON preferred, else CSV)."""
     ctype = (r.headers.get("Content-Type") or "").lower()
     text = r.text
 
@@ -166,15 +263,15 @@ def _try_fetch_rfs_json() -> Dict[str, str]:
       {"districts":[{"name":"Far South Coast","todays_fire_danger_rating":"High"}, ...]}
     """
     url = "https://www.rfs.nsw.gov.au/feeds/fdrToban.json"
-    headers = {"User-Agent": "Outback_Early_Warning"}
-    r = requests.get(url, timeout=10, headers=headers)
+    r = http_client.get(url, timeout=10, source=SOURCE)
     r.raise_for_status()
-    js = r.json()
+    with metrics.timer("feed_parse_seconds", source=SOURCE):
+        js = r.json()
 
-    out: Dict[str, str] = {}
-    for d in js.get("districts", []):
-        name = (d.get("name") or "").strip()
-        rating_raw = (d.get("todays_fire_danger_rating") or "").strip()
-        if name and rating_raw:
-            out[name] = _normalize_level(rating_raw)
+        out: Dict[str, str] = {}
+        for d in js.get("districts", []):
+            name = (d.get("name") or "").strip()
+            rating_raw = (d.get("todays_fire_danger_rating") or "").strip()
+            if name and rating_raw:
+                out[name] = _normalize_level(rating_raw)
     return out
\ No newline at end of file
@@ -0,0 +1,291 @@
+import datetime as dt
+import json
+import os
+import threading
+import uuid
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from cachetools import LRUCache
+
+from src.afdrs import SOURCE as AFDRS_SOURCE, rating_index
+from src.fetch_bom import SOURCE as BOM_SOURCE, BomSnapshot, polygon_key
+from src.fetch_rfs_nsw import SOURCE as RFS_SOURCE, RfsChanges
+from src.spatial_index import PointIndex, PolygonIndex
+from src.utils_cache import on_refresh
+
+try:
+    import fcntl  # serialises outbox appends across worker processes (POSIX)
+except ImportError:
+    fcntl = None
+
+SUBSCRIPTIONS_PATH = Path(os.getenv("ALERTS_SUBSCRIPTIONS", "data/subscriptions.jsonl"))
+OUTBOX_PATH = Path(os.getenv("ALERTS_OUTBOX", "data/alerts_outbox.jsonl"))
+
+
+@dataclass(frozen=True)
+class Subscription:
+    sub_id: str
+    lat: float
+    lon: float
+    radius_km: float = 25.0
+    district: Optional[str] = None
+    label: str = ""
+
+
+class SubscriptionStore:
+    """
+    Watched locations, persisted as JSON lines and indexed spatially.
+    The arrays and PointIndex are rebuilt lazily after adds/removes, so a
+    refresh only ever queries the index instead of visiting every watch.
+    The file is re-read whenever it changes on disk, so watches added by
+    another worker process are picked up on the next query.
+    """
+
+    def __init__(self, path: Path = SUBSCRIPTIONS_PATH):
+        self.path = Path(path)
+        self._subs: Dict[str, Subscription] = {}
+        self._lock = threading.RLock()
+        self._built = None    # (subs list, PointIndex, radius array, {district: [subs]})
+        self._loaded = None   # (mtime_ns, size) of the file behind self._subs
+        self._reload()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _reload(self):
+        """Re-read the JSONL file if it changed since the last load."""
+        with self._lock:
+            stat = self._stat()
+            if stat == self._loaded:
+                return
+            subs: Dict[str, Subscription] = {}
+            try:
+                with open(self.path, encoding="utf-8") as fh:
+                    for line in fh:
+                        if line.strip():
+                            sub = Subscription(**json.loads(line))
+                            subs[sub.sub_id] = sub
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, TypeError) as e:
+                print("Subscriptions load error:", e)
+                return
+            self._subs, self._loaded, self._built = subs, stat, None
+
+    def __len__(self) -> int:
+        self._reload()
+        return len(self._subs)
+
+    def add(self, lat: float, lon: float, radius_km: float = 25.0,
+            district: Optional[str] = None, label: str = "") -> Subscription:
+        sub = Subscription(uuid.uuid4().hex, float(lat), float(lon), float(radius_km), district, label)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(asdict(sub)) + "\n")
+            self._subs[sub.sub_id] = sub
+            self._built = None
+        return sub
+
+    def remove(self, sub_id: str) -> bool:
+        with self._lock:
+            self._reload()  # don't drop watches another worker added
+            if self._subs.pop(sub_id, None) is None:
+                return False
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as fh:
+                for s in self._subs.values():
+                    fh.write(json.dumps(asdict(s)) + "\n")
+            tmp.replace(self.path)
+            self._built = None
+        return True
+
+    def _index(self):
+        self._reload()
+        built = self._built
+        if built is None:
+            with self._lock:
+                subs = list(self._subs.values())
+            by_district: Dict[str, List[Subscription]] = {}
+            for sub in subs:
+                if (sub.district or "").strip():
+                    by_district.setdefault(sub.district, []).append(sub)
+            built = (
+                subs,
+                PointIndex([s.lat for s in subs], [s.lon for s in subs]),
+                np.asarray([s.radius_km for s in subs], dtype=float),
+                by_district,
+            )
+            self._built = built
+        return built
+
+    def near(self, lat: float, lon: float) -> List[Tuple[Subscription, float]]:
+        """Subscriptions whose own radius covers (lat, lon), with the distance in km."""
+        subs, index, radius, _ = self._index()
+        if not subs:
+            return []
+        ids, dist = index.within(lat, lon, float(radius.max()))
+        keep = dist <= radius[ids]
+        return [(subs[i], float(d)) for i, d in zip(ids[keep], dist[keep])]
+
+    def inside(self, polygons: List[Dict]) -> List[Tuple[Subscription, Dict]]:
+        """(subscription, polygon) pairs for watched points inside any of the polygons."""
+        subs, index, _, _ = self._index()
+        if not subs or not polygons:
+            return []
+        point_pos, poly_pos = PolygonIndex.from_polygons(polygons).pairs_many(index.lats, index.lons)
+        seen, out = set(), []
+        for i, j in zip(point_pos, poly_pos):
+            key = (int(i), int(j))
+            if key not in seen:  # several rings of one polygon can match
+                seen.add(key)
+                out.append((subs[int(index.ids[i])], polygons[int(j)]))
+        return out
+
+    def by_district(self) -> Dict[str, List[Subscription]]:
+        """Subscriptions grouped by the district name they were saved with."""
+        return self._index()[3]
+
+
+class AlertEngine:
+    """
+    Turns feed refreshes into per-subscription notifications.
+    Only subscriptions touched by what changed are evaluated: RFS incidents
+    from the guid diff, BOM polygons not seen in the previous snapshot, and
+    districts whose AFDRS rating moved. The first BOM/AFDRS snapshot after
+    start-up is the baseline. Notifications are appended to a JSONL outbox
+    shared by every worker process; each carries an event key, and a key
+    already in the outbox (written by this or another worker) is skipped.
+    """
+
+    def __init__(self, store: SubscriptionStore, outbox: Path = OUTBOX_PATH):
+        self.store = store
+        self.outbox = Path(outbox)
+        self._bom_seen: Optional[set] = None
+        self._ratings = None  # _RatingIndex of the previous AFDRS snapshot
+        self._lock = threading.Lock()
+        self._sent = LRUCache(maxsize=50_000)  # event keys already in the outbox
+        self._read_to: Optional[int] = None     # outbox offset scanned for keys
+
+    def on_rfs_changes(self, changes: RfsChanges):
+        escalated = changes.guids("escalated")
+        events = ([("incident_new", p) for p in changes.new]
+                  + [("incident_escalated" if p["guid"] in escalated else "incident_updated", p)
+                     for p in changes.updated]
+                  + [("incident_closed", p) for p in changes.closed])
+        notes = []
+        for kind, inc in events:
+            try:
+                lat, lon = float(inc["lat"]), float(inc["lon"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            key = f"{kind}|{inc.get('guid')}|{inc.get('updated')}|{inc.get('status')}"
+            for sub, km in self.store.near(lat, lon):
+                notes.append(_note(sub, kind, key, {
+                    "title": inc.get("title"), "status": inc.get("status"),
+                    "category": inc.get("category"), "distance_km": round(km, 1),
+                    "url": inc.get("url"),
+                }))
+        self._deliver(notes)
+
+    def on_bom_snapshot(self, snapshot: BomSnapshot):
+        current = {polygon_key(p): p for p in snapshot.polygons}
+        previous, self._bom_seen = self._bom_seen, set(current)
+        if previous is None:
+            return
+        fresh = [p for k, p in current.items() if k not in previous]
+        self._deliver([
+            _note(sub, "warning", f"warning|{polygon_key(poly)}|{poly.get('effective')}",
+                  {"headline": poly.get("headline"), "area": poly.get("title")})
+            for sub, poly in self.store.inside(fresh)
+        ])
+
+    def on_ratings(self, ratings: Dict[str, str]):
+        # resolve watched names through the same alias/token index as the risk lookups
+        previous, self._ratings = self._ratings, rating_index(ratings)
+        if previous is None:
+            return
+        day = dt.date.today().isoformat()
+        notes = []
+        for district, subs in self.store.by_district().items():
+            level = self._ratings.match(district)
+            if level is None or level == previous.match(district):
+                continue
+            key = f"afdrs|{district}|{level}|{day}"
+            notes += [_note(sub, "afdrs", key, {"district": district, "rating": level}) for sub in subs]
+        self._deliver(notes)
+
+    def _deliver(self, notes: List[Dict]):
+        if not notes:
+            return
+        with self._lock:
+            self.outbox.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.outbox, "ab+") as fh:
+                if fcntl is not None:
+                    fcntl.flock(fh, fcntl.LOCK_EX)  # released when the file is closed
+                self._scan_outbox(fh)
+                for n in notes:
+                    key = (n["sub_id"], n["event"])
+                    if key in self._sent:
+                        continue
+                    self._sent[key] = True
+                    fh.write(json.dumps(n).encode("utf-8") + b"\n")
+                fh.flush()
+                self._read_to = fh.tell()
+
+    def _scan_outbox(self, fh):
+        """Pick up event keys other workers appended since the last delivery."""
+        end = fh.seek(0, os.SEEK_END)
+        start = self._read_to
+        if start is None or start > end:
+            # first delivery (or the outbox was rotated): the recent tail is enough
+            start = max(0, end - (1 << 20))
+            fh.seek(start)
+            if start:
+                fh.readline()  # skip the partial first line
+        else:
+            fh.seek(start)
+        for line in fh:
+            try:
+                n = json.loads(line)
+                self._sent[(n["sub_id"], n["event"])] = True
+            except (ValueError, KeyError, TypeError):
+                continue
+
+
+def _note(sub: Subscription, kind: str, event: str, detail: Dict) -> Dict:
+    return {
+        "at": dt.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "sub_id": sub.sub_id,
+        "label": sub.label,
+        "kind": kind,
+        "event": event,  # identifies the source event; deduplicates across workers
+        "detail": detail,
+    }
+
+
+_engine: Optional[AlertEngine] = None
+_engine_lock = threading.Lock()
+
+
+def start_alerts() -> AlertEngine:
+    """Create the process-wide engine and subscribe it to feed refreshes (idempotent)."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AlertEngine(SubscriptionStore())
+            on_refresh(RFS_SOURCE, _engine.on_rfs_changes)
+            on_refresh(BOM_SOURCE, _engine.on_bom_snapshot)
+            on_refresh(AFDRS_SOURCE, _engine.on_ratings)
+    return _engine
+
+
+def get_subscription_store() -> SubscriptionStore:
+    return start_alerts().store
@@ -0,0 +1,394 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.afdrs import SOURCE as AFDRS_SOURCE
+from src.fetch_bom import SOURCE as BOM_SOURCE, BomSnapshot, polygon_key
+from src.fetch_firms import SOURCE as FIRMS_SOURCE, Hotspots
+from src.fetch_rfs_nsw import SOURCE as RFS_SOURCE, RfsChanges
+from src.spatial_index import geohash_cover, geohash_many, haversine_km, polygon_rings
+from src.utils_cache import on_refresh
+
+# Append-only history, kept apart from the latest-snapshot store so it can
+# grow across seasons without slowing warm starts.
+ARCHIVE_PATH = Path(os.getenv("ARCHIVE_DB", "data/archive.sqlite3"))
+
+_local = threading.local()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS incident_events (
+    t         REAL NOT NULL,          -- unix epoch seconds the change was observed
+    guid      TEXT NOT NULL,
+    kind      TEXT NOT NULL,          -- new | updated | escalated | closed
+    lat       REAL, lon REAL,
+    geohash   TEXT,                   -- precision 9
+    title     TEXT, status TEXT, category TEXT, updated TEXT, url TEXT
+);
+CREATE INDEX IF NOT EXISTS incident_events_geo_t ON incident_events (geohash, t);
+CREATE INDEX IF NOT EXISTS incident_events_t ON incident_events (t);
+CREATE INDEX IF NOT EXISTS incident_events_guid ON incident_events (guid, t);
+-- the same change seen by several workers (or after a restart) is stored once;
+-- COALESCE because a UNIQUE index treats every NULL as distinct
+CREATE UNIQUE INDEX IF NOT EXISTS incident_events_uniq
+    ON incident_events (guid, kind, COALESCE(updated, ''), COALESCE(status, ''),
+                        COALESCE(category, ''), COALESCE(lat, 999), COALESCE(lon, 999));
+-- one row per guid, kept in step with incident_events so radius queries start
+-- from the incidents live in the window rather than each cell's whole history
+CREATE TABLE IF NOT EXISTS incident_spans (
+    guid      TEXT PRIMARY KEY,
+    first_t   REAL NOT NULL,
+    last_t    REAL NOT NULL,
+    last_kind TEXT NOT NULL,
+    geohash   TEXT                    -- latest known position
+);
+CREATE INDEX IF NOT EXISTS incident_spans_geo ON incident_spans (geohash);
+
+CREATE TABLE IF NOT EXISTS warning_events (
+    t         REAL NOT NULL,
+    key       TEXT NOT NULL,
+    kind      TEXT NOT NULL,          -- issued | expired
+    minx REAL, miny REAL, maxx REAL, maxy REAL,
+    headline  TEXT, title TEXT, effective TEXT,
+    polygon   TEXT                    -- JSON [[lon, lat], ...]; only on issued
+);
+CREATE INDEX IF NOT EXISTS warning_events_t ON warning_events (t);
+CREATE INDEX IF NOT EXISTS warning_events_key ON warning_events (key, t);
+-- keys whose latest event is "issued"; kept in step with warning_events so
+-- each BOM refresh diffs against the open set, not the whole history
+CREATE TABLE IF NOT EXISTS warnings_open (key TEXT PRIMARY KEY);
+
+CREATE TABLE IF NOT EXISTS rating_events (
+    t         REAL NOT NULL,
+    district  TEXT NOT NULL,
+    level     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rating_events_t ON rating_events (district, t);
+
+CREATE TABLE IF NOT EXISTS hotspots (
+    acq_time  INTEGER NOT NULL,       -- unix epoch seconds (satellite pass)
+    lat       REAL NOT NULL, lon REAL NOT NULL,
+    geohash   TEXT NOT NULL,
+    frp       REAL, confidence INTEGER,
+    UNIQUE (acq_time, lat, lon)       -- overlapping FIRMS windows re-deliver detections
+);
+CREATE INDEX IF NOT EXISTS hotspots_geo_t ON hotspots (geohash, acq_time);
+CREATE INDEX IF NOT EXISTS hotspots_t ON hotspots (acq_time);
+"""
+
+_INCIDENT_COLS = ("title", "status", "category", "updated", "url")
+
+
+def _conn() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        ARCHIVE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(ARCHIVE_PATH, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        conn.row_factory = sqlite3.Row
+        _local.conn = conn
+    return conn
+
+
+def _write(sql: str, rows: List[tuple]):
+    if not rows:
+        return
+    conn = _conn()
+    conn.execute("BEGIN")
+    try:
+        conn.executemany(sql, rows)
+        conn.execute("COMMIT")
+    except sqlite3.Error:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _prefix_clause(prefixes: List[str]) -> Tuple[str, List[str]]:
+    # range scans on the (geohash, t) index, one per covering cell
+    clause = " OR ".join("(geohash >= ? AND geohash < ?)" for _ in prefixes)
+    args = []
+    for p in prefixes:
+        args += [p, p + "~"]
+    return f"({clause})", args
+
+
+# SET expressions see the stored row, so last_t is compared before it moves
+_SPAN_UPSERT = """
+INSERT INTO incident_spans (guid, first_t, last_t, last_kind, geohash) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (guid) DO UPDATE SET
+    first_t   = MIN(first_t, excluded.first_t),
+    last_kind = CASE WHEN excluded.last_t >= last_t THEN excluded.last_kind ELSE last_kind END,
+    geohash   = CASE WHEN excluded.last_t >= last_t THEN COALESCE(excluded.geohash, geohash) ELSE geohash END,
+    last_t    = MAX(last_t, excluded.last_t)
+"""
+
+
+# --- Writers -------------------------------------------------------------------
+
+def record_incident_changes(changes: RfsChanges, t: Optional[float] = None):
+    t = t or changes.at or time.time()
+    escalated = changes.guids("escalated")
+    events = ([("new", p) for p in changes.new]
+              + [("escalated" if p.get("guid") in escalated else "updated", p) for p in changes.updated]
+              + [("closed", p) for p in changes.closed])
+    if not events:
+        return
+    lats = [_num(p.get("lat")) for _, p in events]
+    lons = [_num(p.get("lon")) for _, p in events]
+    hashes = geohash_many([v if v is not None else 0.0 for v in lats],
+                          [v if v is not None else 0.0 for v in lons])
+    rows = [
+        (t, p.get("guid"), kind, lat, lon, gh if lat is not None and lon is not None else None,
+         *(p.get(c) for c in _INCIDENT_COLS))
+        for (kind, p), lat, lon, gh in zip(events, lats, lons, hashes)
+    ]
+    conn = _conn()
+    conn.execute("BEGIN")
+    try:
+        conn.executemany("INSERT OR IGNORE INTO incident_events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.executemany(_SPAN_UPSERT, [(r[1], r[0], r[0], r[2], r[5]) for r in rows])
+        conn.execute("COMMIT")
+    except sqlite3.Error:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def record_warnings(issued: List[Tuple[str, Dict]], expired_keys: List[str], t: Optional[float] = None):
+    conn = _conn()
+    conn.execute("BEGIN")
+    try:
+        _insert_warnings(conn, issued, expired_keys, t or time.time())
+        conn.execute("COMMIT")
+    except sqlite3.Error:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _insert_warnings(conn: sqlite3.Connection, issued: List[Tuple[str, Dict]],
+                     expired_keys: List[str], t: float):
+    """Append issued/expired events and update warnings_open (caller holds a transaction)."""
+    rows = []
+    for key, p in issued:
+        rings = polygon_rings([p])
+        if rings:
+            pts = np.vstack(rings)
+            bounds = (float(pts[:, 0].min()), float(pts[:, 1].min()),
+                      float(pts[:, 0].max()), float(pts[:, 1].max()))
+        else:
+            bounds = (None, None, None, None)
+        rows.append((t, key, "issued", *bounds, p.get("headline"), p.get("title"),
+                     p.get("effective"), json.dumps(p.get("polygon"), separators=(",", ":"))))
+    rows += [(t, key, "expired", None, None, None, None, None, None, None, None) for key in expired_keys]
+    conn.executemany("INSERT INTO warning_events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.executemany("INSERT OR IGNORE INTO warnings_open (key) VALUES (?)", [(k,) for k, _ in issued])
+    conn.executemany("DELETE FROM warnings_open WHERE key = ?", [(k,) for k in expired_keys])
+
+
+def record_ratings(changed: Dict[str, str], t: Optional[float] = None):
+    t = t or time.time()
+    _write("INSERT INTO rating_events VALUES (?, ?, ?)", [(t, d, lvl) for d, lvl in changed.items()])
+
+
+def record_hotspots(h: Hotspots):
+    if not len(h):
+        return
+    rows = zip(h.acq_time.tolist(), h.lat.tolist(), h.lon.tolist(), geohash_many(h.lat, h.lon),
+               h.frp.tolist(), h.confidence.tolist())
+    _write("INSERT OR IGNORE INTO hotspots VALUES (?, ?, ?, ?, ?, ?)", list(rows))
+
+
+# --- Queries -------------------------------------------------------------------
+
+def incidents_near(lat: float, lon: float, radius_km: float,
+                   t1: float, t2: float) -> List[Dict]:
+    """
+    Incidents within radius_km of (lat, lon) that were active at any point in
+    [t1, t2]: latest known state per guid (as of t2), with distance_km.
+    Closed-before-t1 incidents are excluded; ones closed inside the window
+    are returned with kind == "closed".
+    """
+    clause, args = _prefix_clause(geohash_cover(lat, lon, radius_km))
+    # candidates seen by t2 and not closed before t1, then each one's state as
+    # of t2 through the (guid, t) index
+    rows = _conn().execute(
+        f"""SELECT e.* FROM incident_events e
+            JOIN (SELECT guid, MAX(t) AS t FROM incident_events
+                  WHERE guid IN (SELECT guid FROM incident_spans
+                                 WHERE {clause} AND first_t <= ?
+                                   AND NOT (last_kind = 'closed' AND last_t < ?))
+                    AND t <= ?
+                  GROUP BY guid) last
+              ON e.guid = last.guid AND e.t = last.t""",
+        args + [t2, t1, t2],
+    ).fetchall()
+    latest: Dict[str, sqlite3.Row] = {r["guid"]: r for r in rows}
+    out = []
+    for r in latest.values():
+        if r["t"] < t1 and r["kind"] == "closed":
+            continue
+        d = float(haversine_km(lat, lon, r["lat"], r["lon"]))
+        if d <= radius_km:
+            item = dict(r)
+            item["distance_km"] = round(d, 2)
+            out.append(item)
+    out.sort(key=lambda r: r["distance_km"])
+    return out
+
+
+def incident_history(guid: str) -> List[Dict]:
+    rows = _conn().execute(
+        "SELECT * FROM incident_events WHERE guid = ? ORDER BY t", (guid,)
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def incident_events_between(t1: float, t2: float) -> List[Dict]:
+    """Every incident event with t1 <= t <= t2, oldest first."""
+    rows = _conn().execute(
+        "SELECT * FROM incident_events WHERE t >= ? AND t <= ? ORDER BY t", (t1, t2)
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def incidents_at(t: float) -> List[Dict]:
+    """Open incidents as of time t (latest event per guid, closed ones dropped)."""
+    rows = _conn().execute(
+        """SELECT e.* FROM incident_events e
+           JOIN (SELECT guid, MAX(t) AS t FROM incident_events WHERE t <= ? GROUP BY guid) last
+             ON e.guid = last.guid AND e.t = last.t
+           WHERE e.kind != 'closed'""",
+        (t,),
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def warning_events_between(t1: float, t2: float) -> List[Dict]:
+    rows = _conn().execute(
+        "SELECT * FROM warning_events WHERE t >= ? AND t <= ? ORDER BY t", (t1, t2)
+    ).fetchall()
+    return [_warning_row(r) for r in rows]
+
+
+def warnings_at(t: float) -> List[Dict]:
+    """Warning polygons in force at time t, in the get_bom_polygons() shape."""
+    rows = _conn().execute(
+        """SELECT e.* FROM warning_events e
+           JOIN (SELECT key, MAX(t) AS t FROM warning_events WHERE t <= ? GROUP BY key) last
+             ON e.key = last.key AND e.t = last.t
+           WHERE e.kind = 'issued'""",
+        (t,),
+    ).fetchall()
+    return [_warning_row(r) for r in rows]
+
+
+def _warning_row(r: sqlite3.Row) -> Dict:
+    item = dict(r)
+    item["polygon"] = json.loads(item["polygon"]) if item.get("polygon") else None
+    return item
+
+
+def ratings_at(t: float) -> Dict[str, str]:
+    rows = _conn().execute(
+        """SELECT district, level FROM rating_events e
+           WHERE t = (SELECT MAX(t) FROM rating_events WHERE district = e.district AND t <= ?)""",
+        (t,),
+    ).fetchall()
+    return {r["district"]: r["level"] for r in rows}
+
+
+def hotspots_between(t1: float, t2: float, near: Optional[Tuple[float, float, float]] = None) -> Hotspots:
+    """Archived hotspots acquired in [t1, t2]; near=(lat, lon, km) restricts to a radius."""
+    sql = "SELECT * FROM hotspots WHERE acq_time >= ? AND acq_time <= ? ORDER BY acq_time"
+    args = [int(t1), int(t2)]
+    if near is not None:
+        # a radius is far more selective than a time window over a season:
+        # "+acq_time" stops SQLite choosing the time index over the geohash one
+        clause, prefix_args = _prefix_clause(geohash_cover(*near))
+        sql = f"SELECT * FROM hotspots WHERE {clause} AND +acq_time >= ? AND +acq_time <= ? ORDER BY +acq_time"
+        args = prefix_args + args
+    rows = _conn().execute(sql, args).fetchall()
+    h = Hotspots(
+        lat=np.asarray([r["lat"] for r in rows], dtype=float),
+        lon=np.asarray([r["lon"] for r in rows], dtype=float),
+        frp=np.asarray([r["frp"] or 0.0 for r in rows], dtype=np.float32),
+        acq_time=np.asarray([r["acq_time"] for r in rows], dtype=np.int64),
+        confidence=np.asarray([r["confidence"] or 0 for r in rows], dtype=np.uint8),
+    )
+    if near is None or not len(h):
+        return h
+    keep = haversine_km(near[0], near[1], h.lat, h.lon) <= near[2]
+    return Hotspots(h.lat[keep], h.lon[keep], h.frp[keep], h.acq_time[keep], h.confidence[keep])
+
+
+def _num(v) -> Optional[float]:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+# --- Refresh listeners -----------------------------------------------------------
+
+class _Archiver:
+    """
+    Turns refresh payloads into archive rows. BOM and AFDRS snapshots are
+    diffed against what the archive itself says is current, so several
+    worker processes refreshing the same feed don't double-record.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def on_rfs_changes(self, changes: RfsChanges):
+        record_incident_changes(changes)
+
+    def on_bom_snapshot(self, snapshot: BomSnapshot):
+        current = {polygon_key(p): p for p in snapshot.polygons}
+        with self._lock:
+            conn = _conn()
+            # IMMEDIATE: read the open set and write the diff without another worker in between
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                open_keys = {r["key"] for r in conn.execute("SELECT key FROM warnings_open")}
+                issued = [(k, p) for k, p in current.items() if k not in open_keys]
+                expired = [k for k in open_keys if k not in current]
+                if issued or expired:
+                    _insert_warnings(conn, issued, expired, time.time())
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+
+    def on_ratings(self, ratings: Dict[str, str]):
+        with self._lock:
+            known = ratings_at(time.time())
+            record_ratings({d: lvl for d, lvl in ratings.items() if known.get(d) != lvl})
+
+    def on_hotspots(self, hotspots: Hotspots):
+        record_hotspots(hotspots)
+
+
+_archiver: Optional[_Archiver] = None
+_archiver_lock = threading.Lock()
+
+
+def start_archive():
+    """Subscribe the archive to every feed refresh (idempotent). ARCHIVE_DISABLED=1 turns it off."""
+    global _archiver
+    if os.getenv("ARCHIVE_DISABLED"):
+        return None
+    with _archiver_lock:
+        if _archiver is None:
+            _archiver = _Archiver()
+            on_refresh(RFS_SOURCE, _archiver.on_rfs_changes)
+            on_refresh(BOM_SOURCE, _archiver.on_bom_snapshot)
+            on_refresh(AFDRS_SOURCE, _archiver.on_ratings)
+            on_refresh(FIRMS_SOURCE, _archiver.on_hotspots)
+    return _archiver
@@ -0,0 +1,59 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from src import metrics
+
+# shared pool: a job that overruns its deadline keeps its worker until the
+# underlying HTTP timeout fires, but never blocks the caller
+_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="fetch")
+
+
+@dataclass
+class FetchOutcome:
+    results: Dict[str, Any] = field(default_factory=dict)
+    status: Dict[str, str] = field(default_factory=dict)  # name -> "ok" | "timeout" | "error: ..."
+
+    def ok(self, name: str) -> bool:
+        return self.status.get(name) == "ok"
+
+    @property
+    def degraded(self) -> Dict[str, str]:
+        """Sources that did not come back cleanly."""
+        return {k: v for k, v in self.status.items() if v != "ok"}
+
+
+def fetch_all(jobs: Dict[str, Callable[[], Any]],
+              deadline: float = 12.0,
+              timeouts: Optional[Dict[str, float]] = None,
+              defaults: Optional[Dict[str, Any]] = None) -> FetchOutcome:
+    """
+    Run independent fetch jobs in parallel and collect whatever finishes in time.
+    `deadline` bounds the whole call; `timeouts` can give individual sources a
+    shorter budget. Late or failing jobs get their `defaults` value (or None)
+    and a status explaining why, so callers can render partial results.
+    """
+    timeouts = timeouts or {}
+    defaults = defaults or {}
+    start = time.monotonic()
+    futures = {name: _POOL.submit(fn) for name, fn in jobs.items()}
+
+    out = FetchOutcome()
+    # wait on the tightest budgets first so one slow source can't eat the rest
+    for name in sorted(futures, key=lambda n: min(timeouts.get(n, deadline), deadline)):
+        budget = min(timeouts.get(name, deadline), deadline)
+        remaining = max(0.0, start + budget - time.monotonic())
+        try:
+            out.results[name] = futures[name].result(timeout=remaining)
+            out.status[name] = "ok"
+        except FutureTimeout:
+            out.results[name] = defaults.get(name)
+            out.status[name] = "timeout"
+            metrics.inc("fetch_job_errors_total", job=name, reason="timeout")
+        except Exception as e:
+            print(f"Fetch error ({name}):", e)
+            metrics.inc("fetch_job_errors_total", job=name, reason="error")
+            out.results[name] = defaults.get(name)
+            out.status[name] = f"error: {e}"
+    return out
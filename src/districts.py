@@ -0,0 +1,107 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import shapely
+
+from src import metrics
+
+# Fire weather district polygons, GeoJSON FeatureCollection with a "name" property.
+DISTRICTS_PATH = Path(__file__).resolve().parent.parent / "nsw_fire_districts.geojson"
+
+_OUTSIDE = -2   # cell touches no district
+_BOUNDARY = -1  # cell straddles a district edge: needs an exact polygon test
+
+
+class DistrictIndex:
+    """
+    Raster index over district polygons.
+    Every grid cell fully inside one district stores that district's id, so
+    most lookups are a single array read; only points in cells crossed by a
+    boundary fall through to an exact test against prepared polygons, which
+    are checked in file order so overlaps resolve deterministically.
+    """
+
+    def __init__(self, names: List[str], geoms: List, cell_deg: float = 0.05):
+        self.names = list(names)
+        self.geoms = np.asarray(geoms, dtype=object)
+        self.cell_deg = float(cell_deg)
+        if not len(self.geoms):
+            self.grid = np.full((0, 0), _OUTSIDE, dtype=np.int16)
+            self.x0 = self.y0 = 0.0
+            return
+        shapely.prepare(self.geoms)
+
+        xmin, ymin, xmax, ymax = shapely.total_bounds(self.geoms)
+        self.x0, self.y0 = xmin, ymin
+        nx = int(np.ceil((xmax - xmin) / self.cell_deg))
+        ny = int(np.ceil((ymax - ymin) / self.cell_deg))
+        gx, gy = np.meshgrid(xmin + np.arange(nx) * self.cell_deg,
+                             ymin + np.arange(ny) * self.cell_deg)
+        cells = shapely.box(gx, gy, gx + self.cell_deg, gy + self.cell_deg)  # (ny, nx)
+
+        grid = np.full((ny, nx), _OUTSIDE, dtype=np.int16)
+        touched = np.zeros((ny, nx), dtype=np.int16)
+        for i, g in enumerate(self.geoms):
+            inside = shapely.contains_properly(g, cells)
+            hits = shapely.intersects(g, cells)
+            grid[inside & (grid == _OUTSIDE)] = i
+            touched += hits
+        # any cell touched by a second district, or only partly covered, is a boundary cell
+        partial = (touched > 0) & ((grid == _OUTSIDE) | (touched > 1))
+        grid[partial] = _BOUNDARY
+        self.grid = grid
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def lookup(self, lat: float, lon: float) -> Optional[str]:
+        return self.lookup_many([lat], [lon])[0]
+
+    def lookup_many(self, lats, lons) -> List[Optional[str]]:
+        """District name per point (None outside every district)."""
+        lats = np.asarray(lats, dtype=float).reshape(-1)
+        lons = np.asarray(lons, dtype=float).reshape(-1)
+        ids = np.full(len(lats), _OUTSIDE, dtype=np.int16)
+        if not len(self) or not len(lats):
+            return [None] * len(lats)
+
+        ny, nx = self.grid.shape
+        r = np.floor((lats - self.y0) / self.cell_deg).astype(np.int64)
+        c = np.floor((lons - self.x0) / self.cell_deg).astype(np.int64)
+        on_grid = (r >= 0) & (r < ny) & (c >= 0) & (c < nx)
+        ids[on_grid] = self.grid[r[on_grid], c[on_grid]]
+
+        pending = np.nonzero(ids == _BOUNDARY)[0]
+        ids[pending] = _OUTSIDE
+        for i, g in enumerate(self.geoms):
+            if not len(pending):
+                break
+            hit = shapely.intersects_xy(g, lons[pending], lats[pending])
+            ids[pending[hit]] = i
+            pending = pending[~hit]
+
+        return [self.names[i] if i >= 0 else None for i in ids]
+
+
+@lru_cache(maxsize=1)
+def load_district_index() -> DistrictIndex:
+    """Build the index from the bundled boundaries once per process."""
+    names, geoms = [], []
+    try:
+        with open(DISTRICTS_PATH, encoding="utf-8") as fh:
+            fc = json.load(fh)
+        for feat in fc.get("features", []):
+            name = ((feat.get("properties") or {}).get("name") or "").strip()
+            geom = feat.get("geometry")
+            if name and geom:
+                names.append(name)
+                geoms.append(shapely.geometry.shape(geom))
+    except (OSError, ValueError) as e:
+        print("District boundaries load error:", e)
+    return DistrictIndex(names, geoms)
+
+
+metrics.watch_lru("districts", load_district_index)
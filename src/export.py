@@ -0,0 +1,104 @@
+import datetime as dt
+import gzip
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from src.fetch_rfs_nsw import get_rfs_points
+from src.geo_utils import incident_color
+from src.utils_cache import memo_per_snapshot
+
+try:  # optional fast encoder; falls back to compact stdlib json
+    import orjson
+except ImportError:
+    orjson = None
+
+
+@dataclass(frozen=True)
+class ExportBlob:
+    data: bytes
+    etag: str          # quoted sha1 of data, usable as an HTTP ETag
+    gzipped: bool
+    feature_count: int
+
+
+def dumps_compact(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def incident_features(points: List[Dict], radius_m: Optional[float] = None) -> List[Dict]:
+    """GeoJSON Point features for RFS incidents (records without coordinates are skipped)."""
+    features = []
+    for p in points or []:
+        lat, lon = p.get("lat"), p.get("lon")
+        if lat is None or lon is None:
+            continue
+        props = {
+            "title": p.get("title"),
+            "status": p.get("status") or "No official status published",
+            "updated": p.get("updated") or "",
+            "url": p.get("url"),
+            "source": p.get("source") or "NSW RFS",
+            "color": incident_color(p.get("status"), p.get("title")),
+        }
+        if radius_m is not None:
+            props["radius"] = radius_m
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [float(lon), float(lat)]},
+            "properties": props,
+        })
+    return features
+
+
+class _SnapshotExports:
+    """Serialised exports of one snapshot, keyed by (radius, gzip)."""
+
+    def __init__(self, points: List[Dict]):
+        self.points = points
+        # stamped once, so the bytes (and ETag) only change with the snapshot
+        self.generated_at = dt.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        self._blobs: Dict[tuple, ExportBlob] = {}
+        self._lock = threading.RLock()  # the gzip variant builds the plain one first
+
+    def get(self, radius_m: Optional[float], gz: bool) -> ExportBlob:
+        key = (radius_m, gz)
+        blob = self._blobs.get(key)
+        if blob is not None:
+            return blob
+        with self._lock:
+            blob = self._blobs.get(key)
+            if blob is None:
+                if gz:
+                    raw = self.get(radius_m, False)
+                    # mtime=0 keeps the compressed bytes deterministic
+                    data = gzip.compress(raw.data, compresslevel=6, mtime=0)
+                    count = raw.feature_count
+                else:
+                    features = incident_features(self.points, radius_m)
+                    data = dumps_compact({
+                        "type": "FeatureCollection",
+                        "generated_at_utc": self.generated_at,
+                        "features": features,
+                    })
+                    count = len(features)
+                blob = ExportBlob(data, '"' + hashlib.sha1(data).hexdigest() + '"', gz, count)
+                self._blobs[key] = blob
+        return blob
+
+
+def export_incidents(points: Optional[List[Dict]] = None,
+                     radius_m: Optional[float] = None,
+                     gz: bool = False) -> ExportBlob:
+    """
+    Compact GeoJSON FeatureCollection of the current RFS snapshot.
+    Built and serialised once per snapshot (and radius/gzip variant); page
+    reruns get the cached bytes back.
+    """
+    if points is None:
+        points = get_rfs_points() or []
+    return memo_per_snapshot("export:rfs", points, _SnapshotExports).get(radius_m, gz)
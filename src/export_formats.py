@@ -0,0 +1,188 @@
+import datetime as dt
+import hashlib
+import io
+import threading
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import geopandas as gpd
+import numpy as np
+import pyogrio
+import shapely
+
+from src.export import ExportBlob, dumps_compact, incident_features
+from src.fetch_bom import get_bom_polygons
+from src.fetch_firms import Hotspots, get_firms_points
+from src.fetch_rfs_nsw import get_rfs_points
+from src.spatial_index import polygon_rings
+from src.utils_cache import memo_per_snapshot
+
+# format -> (file extension, MIME type)
+FORMATS: Dict[str, Tuple[str, str]] = {
+    "geojsonseq": (".geojsons", "application/geo+json-seq"),
+    "flatgeobuf": (".fgb", "application/flatgeobuf"),
+    "geoparquet": (".parquet", "application/vnd.apache.parquet"),
+}
+LAYERS = ("incidents", "warnings", "hotspots")
+
+
+# --- Features ------------------------------------------------------------------
+
+def warning_features(polygons: List[Dict]) -> Iterator[Dict]:
+    """One Polygon feature per BOM warning ring, as drawn on the map."""
+    for p in polygons or []:
+        for ring in polygon_rings([p]):
+            coords = ring.tolist()
+            if coords[0] != coords[-1]:
+                coords.append(coords[0])
+            yield {
+                "type": "Feature",
+                "geometry": {"type": "Polygon", "coordinates": [coords]},
+                "properties": {
+                    "title": p.get("title"),
+                    "headline": p.get("headline"),
+                    "effective": p.get("effective"),
+                    "identifier": p.get("identifier"),
+                },
+            }
+
+
+def hotspot_features(h: Hotspots) -> Iterator[Dict]:
+    for lat, lon, frp, t, conf in zip(h.lat.tolist(), h.lon.tolist(), h.frp.tolist(),
+                                      h.acq_time.tolist(), h.confidence.tolist()):
+        yield {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [lon, lat]},
+            "properties": {"frp": round(frp, 2), "confidence": conf, "acquired_utc": _iso(t)},
+        }
+
+
+def iter_geojsonseq(features: Iterable[Dict]) -> Iterator[bytes]:
+    """Newline-delimited GeoJSON (GeoJSONSeq): one compact feature per line."""
+    for f in features:
+        yield dumps_compact(f) + b"\n"
+
+
+def append_geojsonseq(path, features: Iterable[Dict]) -> int:
+    """Append features to a .geojsons file (created if missing); returns the count written."""
+    n = 0
+    with open(path, "ab") as fh:
+        for line in iter_geojsonseq(features):
+            fh.write(line)
+            n += 1
+    return n
+
+
+# --- Frames --------------------------------------------------------------------
+
+def incidents_frame(points: List[Dict]) -> gpd.GeoDataFrame:
+    feats = incident_features(points)
+    props = [dict(f["properties"]) for f in feats]
+    for p in props:
+        p.pop("color", None)  # map styling, not data
+    xy = np.asarray([f["geometry"]["coordinates"] for f in feats], dtype=float).reshape(-1, 2)
+    return gpd.GeoDataFrame(props, geometry=shapely.points(xy), crs="EPSG:4326")
+
+
+def warnings_frame(polygons: List[Dict]) -> gpd.GeoDataFrame:
+    feats = list(warning_features(polygons))
+    geoms = [shapely.polygons(f["geometry"]["coordinates"][0]) for f in feats]
+    return gpd.GeoDataFrame([f["properties"] for f in feats], geometry=geoms, crs="EPSG:4326")
+
+
+def hotspots_frame(h: Hotspots) -> gpd.GeoDataFrame:
+    return gpd.GeoDataFrame(
+        {
+            "frp": h.frp,
+            "confidence": h.confidence,
+            "acquired_utc": (h.acq_time * 1_000_000_000).astype("datetime64[ns]"),
+        },
+        geometry=shapely.points(h.lon, h.lat),
+        crs="EPSG:4326",
+    )
+
+
+def _iso(epoch: int) -> str:
+    return dt.datetime.utcfromtimestamp(epoch).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+# --- Writers -------------------------------------------------------------------
+
+def _write(fmt: str, layer: str, snapshot) -> Tuple[bytes, int]:
+    # Exports are served as one cached, ETagged blob per snapshot and format, so
+    # each file is built whole in memory (FlatGeobuf and GeoParquet via a full
+    # GeoDataFrame). Snapshots are at most a few tens of thousands of rows.
+    if fmt == "geojsonseq":
+        feats = _features(layer, snapshot)
+        buf = io.BytesIO()
+        n = 0
+        for line in iter_geojsonseq(feats):
+            buf.write(line)
+            n += 1
+        return buf.getvalue(), n
+
+    frame = _frame(layer, snapshot)
+    buf = io.BytesIO()
+    if fmt == "flatgeobuf":
+        # packed Hilbert R-tree, so readers can bbox-filter without a full scan
+        pyogrio.write_dataframe(frame, buf, driver="FlatGeobuf", layer=layer, SPATIAL_INDEX="YES")
+    elif fmt == "geoparquet":
+        frame.to_parquet(buf, index=False, compression="zstd")
+    else:
+        raise ValueError(f"unknown export format: {fmt}")
+    return buf.getvalue(), len(frame)
+
+
+def _features(layer: str, snapshot) -> Iterable[Dict]:
+    if layer == "incidents":
+        return incident_features(snapshot)
+    if layer == "warnings":
+        return warning_features(snapshot)
+    return hotspot_features(snapshot)
+
+
+def _frame(layer: str, snapshot) -> gpd.GeoDataFrame:
+    if layer == "incidents":
+        return incidents_frame(snapshot)
+    if layer == "warnings":
+        return warnings_frame(snapshot)
+    return hotspots_frame(snapshot)
+
+
+class _LayerExports:
+    """Encoded files for one layer snapshot, one per format."""
+
+    def __init__(self, layer: str, snapshot):
+        self.layer = layer
+        self.snapshot = snapshot
+        self._blobs: Dict[str, ExportBlob] = {}
+        self._lock = threading.Lock()
+
+    def get(self, fmt: str) -> ExportBlob:
+        blob = self._blobs.get(fmt)
+        if blob is None:
+            with self._lock:
+                blob = self._blobs.get(fmt)
+                if blob is None:
+                    data, n = _write(fmt, self.layer, self.snapshot)
+                    blob = ExportBlob(data, '"' + hashlib.sha1(data).hexdigest() + '"', False, n)
+                    self._blobs[fmt] = blob
+        return blob
+
+
+def _snapshot(layer: str):
+    if layer == "incidents":
+        return get_rfs_points() or []
+    if layer == "warnings":
+        return get_bom_polygons() or []
+    return get_firms_points()
+
+
+def export_layer(layer: str, fmt: str) -> ExportBlob:
+    """
+    Current snapshot of `layer` (incidents, warnings, hotspots) encoded as
+    `fmt` (see FORMATS); encoded once per snapshot and format.
+    """
+    if layer not in LAYERS or fmt not in FORMATS:
+        raise ValueError(f"unknown export: {layer}/{fmt}")
+    return memo_per_snapshot(f"export:{layer}", _snapshot(layer),
+                             lambda snap: _LayerExports(layer, snap)).get(fmt)
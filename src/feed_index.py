@@ -0,0 +1,232 @@
+import re
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src import metrics
+from src.fetch_bom import BomSnapshot, get_bom_feed, get_bom_snapshot
+from src.fetch_rfs_nsw import get_rfs_points
+
+try:
+    from zoneinfo import ZoneInfo
+    _NSW_TZ = ZoneInfo("Australia/Sydney")
+except Exception:  # no tz database: AEST is close enough for ordering
+    _NSW_TZ = timezone(timedelta(hours=10))
+
+# --- Categories ------------------------------------------------------------------
+
+BUSHFIRE, FLOOD, SEVERE_WEATHER = 1, 2, 4
+CATEGORIES = {"Bushfire": BUSHFIRE, "Flood": FLOOD, "Severe Weather": SEVERE_WEATHER}
+
+# substring rules carried over from the Feed page filter
+_CATEGORY_TERMS = (
+    (BUSHFIRE, ("fire", "bushfire", "nsw rfs")),
+    (FLOOD, ("flood",)),
+    (SEVERE_WEATHER, ("storm", "severe", "wind", "weather")),
+)
+
+_SOURCE_CATEGORIES = {"NSW RFS": BUSHFIRE}  # every RFS incident is a bushfire item
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def categorise(text: str, source: str = "") -> int:
+    """Category bitmask for an item's title + summary."""
+    t = text.lower()
+    bits = _SOURCE_CATEGORIES.get(source, 0)
+    for bit, terms in _CATEGORY_TERMS:
+        if any(term in t for term in terms):
+            bits |= bit
+    return bits
+
+
+# --- Timestamps -----------------------------------------------------------------
+
+# formats seen across RFS / BOM / custom feeds; naive times are NSW local
+_TIME_FORMATS = ("%d/%m/%Y %I:%M:%S %p", "%d/%m/%Y %H:%M", "%d %b %Y %H:%M", "%Y-%m-%d %H:%M")
+
+
+def parse_time(raw: str) -> Optional[datetime]:
+    """Parse a feed timestamp to an aware UTC datetime (None if unrecognised)."""
+    s = (raw or "").strip()
+    if not s:
+        return None
+    ts = None
+    try:
+        ts = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except ValueError:
+        for fmt in _TIME_FORMATS:
+            try:
+                ts = datetime.strptime(s, fmt)
+                break
+            except ValueError:
+                continue
+        if ts is None:
+            try:
+                ts = parsedate_to_datetime(s)  # RFC 2822, as in RSS pubDate
+            except (TypeError, ValueError):
+                return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=_NSW_TZ)
+    return ts.astimezone(timezone.utc)
+
+
+# --- Index ----------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class FeedItem:
+    guid: Optional[str]
+    source: str
+    title: str
+    summary: str
+    url: Optional[str]
+    time: Optional[datetime]   # UTC; None if the feed's timestamp didn't parse
+    time_label: str            # "2019-12-30 23:00 UTC", or the raw string
+    categories: int            # bitmask of BUSHFIRE / FLOOD / SEVERE_WEATHER
+
+
+@dataclass(frozen=True)
+class FeedPage:
+    items: List[FeedItem]
+    total: int       # matching items across all pages
+    page: int        # 0-based, clamped to the last page
+    pages: int
+
+
+class FeedIndex:
+    """
+    Merged RFS + BOM feed, sorted newest first (unparseable times last), with
+    one position list per category and an inverted keyword index. Positions
+    are indexes into the sorted list, so every posting list is already in
+    display order and filtering never re-sorts.
+    """
+
+    def __init__(self, items: Sequence[FeedItem]):
+        order = sorted(range(len(items)), key=lambda i: (
+            items[i].time is None,
+            -(items[i].time.timestamp() if items[i].time else 0.0),
+        ))
+        self.items: List[FeedItem] = [items[i] for i in order]
+        n = len(self.items)
+        self._all = np.arange(n, dtype=np.int32)
+
+        bits = np.fromiter((it.categories for it in self.items), dtype=np.uint8, count=n)
+        self._by_category: Dict[int, np.ndarray] = {
+            bit: np.flatnonzero(bits & bit).astype(np.int32) for bit in CATEGORIES.values()
+        }
+
+        postings: Dict[str, List[int]] = {}
+        for pos, it in enumerate(self.items):
+            for tok in set(_TOKEN.findall(f"{it.title} {it.summary}".lower())):
+                postings.setdefault(tok, []).append(pos)
+        self._postings = {t: np.asarray(p, dtype=np.int32) for t, p in postings.items()}
+        self._vocab = sorted(self._postings)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _prefix(self, prefix: str) -> np.ndarray:
+        """Positions of items with any token starting with prefix (type-ahead search)."""
+        lo = bisect_left(self._vocab, prefix)
+        hits = []
+        for tok in self._vocab[lo:]:
+            if not tok.startswith(prefix):
+                break
+            hits.append(self._postings[tok])
+        if not hits:
+            return self._all[:0]
+        return np.unique(np.concatenate(hits)) if len(hits) > 1 else hits[0]
+
+    def positions(self, category: str = "All", query: str = "") -> np.ndarray:
+        """Sorted positions matching the category and every word of query."""
+        pos = self._all if category == "All" else self._by_category.get(CATEGORIES.get(category, 0), self._all[:0])
+        words = _TOKEN.findall((query or "").lower())
+        for i, w in enumerate(words):
+            # whole words, except the last one which is matched as a prefix while typing
+            posting = self._prefix(w) if i == len(words) - 1 else self._postings.get(w, self._all[:0])
+            pos = np.intersect1d(pos, posting, assume_unique=True)
+            if not len(pos):
+                break
+        return pos
+
+    def page(self, category: str = "All", query: str = "", page: int = 0, page_size: int = 25) -> FeedPage:
+        return self.paginate(self.positions(category, query), page, page_size)
+
+    def paginate(self, pos: np.ndarray, page: int = 0, page_size: int = 25) -> FeedPage:
+        """One page of already-computed positions (see positions())."""
+        pages = page_count(len(pos), page_size)
+        page = max(0, min(page, pages - 1))
+        chunk = pos[page * page_size:(page + 1) * page_size]
+        return FeedPage([self.items[i] for i in chunk], len(pos), page, pages)
+
+
+def page_count(total: int, page_size: int) -> int:
+    return max(1, -(-total // page_size))
+
+
+def _label(ts: Optional[datetime], raw: str) -> str:
+    return ts.strftime("%Y-%m-%d %H:%M UTC") if ts else (raw or "")
+
+
+def _rfs_feed(points: Sequence[Dict]) -> List[Dict]:
+    # same fields as fetch_rfs_nsw.get_rfs_feed, minus its sort on the raw time string
+    return [{
+        "guid": p.get("guid"),
+        "time": p.get("updated"),
+        "title": p.get("title"),
+        "summary": f"Status: {p.get('status')}",
+        "url": p.get("url"),
+    } for p in points]
+
+
+def build_feed_index(rfs_points: Sequence[Dict], bom: Optional[BomSnapshot]) -> FeedIndex:
+    items = []
+    for source, feed in (("NSW RFS", _rfs_feed(rfs_points)),
+                         ("BOM", get_bom_feed(bom) if bom is not None else [])):
+        for f in feed:
+            raw = f.get("time") or ""
+            ts = parse_time(raw)
+            title, summary = f.get("title") or "Untitled", f.get("summary") or ""
+            items.append(FeedItem(
+                guid=f.get("guid"), source=source, title=title, summary=summary, url=f.get("url"),
+                time=ts, time_label=_label(ts, raw),
+                categories=categorise(f"{title} {summary}", source),
+            ))
+    return FeedIndex(items)
+
+
+# built from one (RFS snapshot, BOM snapshot) pair; rebuilt only when either object changes
+_built = None
+_built_lock = threading.Lock()
+_NO_POINTS: tuple = ()
+_NO_BOM = BomSnapshot()
+
+
+def get_feed_index(rfs_points: Optional[Sequence[Dict]] = None,
+                   bom: Optional[BomSnapshot] = None) -> FeedIndex:
+    """
+    FeedIndex for the given snapshots (the cached ones by default).
+    Pass what fetch_all returned so a degraded source just drops out.
+    """
+    global _built
+    if rfs_points is None:
+        rfs_points = get_rfs_points()
+    if bom is None:
+        bom = get_bom_snapshot()
+    # empty stand-ins (e.g. fetch_all defaults) share one identity so they still hit
+    rfs_points = rfs_points or _NO_POINTS
+    bom = bom if bom.warnings else _NO_BOM
+    with _built_lock:
+        hit = _built
+    metrics.cache_lookup("feed_index", hit is not None and hit[0] is rfs_points and hit[1] is bom)
+    if hit is not None and hit[0] is rfs_points and hit[1] is bom:
+        return hit[2]
+    index = build_feed_index(rfs_points, bom)
+    with _built_lock:
+        _built = (rfs_points, bom, index)
+    return index
@@ -1,62 +1,172 @@
-import requests
-from bs4 import BeautifulSoup
-from src.utils_cache import update_cache_time
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import List, Dict, Optional
+
+from cachetools import TTLCache
+from lxml import etree
+
+from src import http_client, metrics
+from src.snapshot_store import load_snapshot, save_snapshot
+from src.utils_cache import update_cache_time, single_flight, notify_refresh
+
+BOM_WARNINGS_URL = "http://www.bom.gov.au/fwo/IDZ00059.warnings_nsw.xml"
+SOURCE = "BOM warnings (CAP)"
+
+# cache one parsed snapshot for 10 minutes (shared by map, feed and risk model)
+_cache = TTLCache(maxsize=1, ttl=600)
+
+
+@dataclass
+class BomSnapshot:
+    polygons: List[Dict] = field(default_factory=list)  # map-ready warning areas
+    warnings: List[Dict] = field(default_factory=list)  # one item per CAP <info>
+
+
+# last successful snapshot; outlives the TTL so a failed refresh can fall back to it
+_last_good: Optional[BomSnapshot] = None
+
+
+def get_bom_snapshot() -> BomSnapshot:
+    """Fetch + parse the NSW CAP warnings XML once per TTL window."""
+    if "snapshot" in _cache:
+        metrics.cache_lookup("bom", True)
+        return _cache["snapshot"]
+    metrics.cache_lookup("bom", False)
+    with single_flight(SOURCE):
+        if "snapshot" in _cache:
+            return _cache["snapshot"]
+        return refresh_bom_snapshot(reuse_within=_cache.ttl)
+
+
+def refresh_bom_snapshot(reuse_within: float = 0) -> BomSnapshot:
+    """
+    Fetch + parse now and replace the cached snapshot (keeps the old one on error).
+    A disk snapshot younger than reuse_within seconds is adopted instead.
+    """
+    global _last_good
+    saved = load_snapshot(SOURCE, max_age_s=reuse_within) if reuse_within else None
+    if saved is not None:
+        payload, fetched_at = saved
+        snapshot = BomSnapshot(**payload)
+        update_cache_time(SOURCE, fetched_at)
+        _cache["snapshot"] = _last_good = snapshot
+        notify_refresh(SOURCE, snapshot)
+        return snapshot
 
-def get_bom_polygons():
-    """Fetch BOM warnings polygons for map display."""
-    url = "http://www.bom.gov.au/fwo/IDZ00059.warnings_nsw.xml"
     try:
-        resp = requests.get(url, timeout=10)
-        soup = BeautifulSoup(resp.content, "xml")
+        resp = http_client.get(BOM_WARNINGS_URL, timeout=10, source=SOURCE)
+        resp.raise_for_status()
+        with metrics.timer("feed_parse_seconds", source=SOURCE):
+            snapshot = parse_bom_cap(resp.content)
     except Exception as e:
+        metrics.inc("feed_errors_total", source=SOURCE)
         print("Error fetching BOM warnings:", e)
-        return []
+        return _last_good if _last_good is not None else BomSnapshot()
 
-    polys = []
-    for area in soup.find_all("area"):
-        polygon_text = area.find("polygon")
-        if not polygon_text:
-            continue
-        coords = []
-        for pair in polygon_text.text.split(" "):
-            try:
-                lat, lon = pair.split(",")
-                coords.append([float(lon), float(lat)])
-            except:
-                continue
-        if coords:
-            polys.append({
-                "polygon": coords,
-                "fill_r": 255, "fill_g": 165, "fill_b": 0,  # orange
-                "title": area.find("areaDesc").text if area.find("areaDesc") else "BOM Area"
-            })
+    update_cache_time(SOURCE)
+    # the lists are already JSON-ready; asdict() would deep-copy every coordinate
+    save_snapshot(SOURCE, {"polygons": snapshot.polygons, "warnings": snapshot.warnings})
+    _cache["snapshot"] = _last_good = snapshot
+    notify_refresh(SOURCE, snapshot)
+    return snapshot
 
-    update_cache_time("BOM warnings (CAP)")
-    return polys
 
+def get_bom_polygons():
+    """BOM warning polygons for map display."""
+    return get_bom_snapshot().polygons
 
-def get_bom_feed():
-    """Fetch BOM warning feed items for list display."""
-    url = "http://www.bom.gov.au/fwo/IDZ00059.warnings_nsw.xml"
-    try:
-        resp = requests.get(url, timeout=10)
-        soup = BeautifulSoup(resp.content, "xml")
-    except Exception as e:
-        print("Error fetching BOM warnings feed:", e)
-        return []
-
-    feed = []
-    for info in soup.find_all("info"):
-        headline = info.find("headline").text if info.find("headline") else "BOM Warning"
-        effective = info.find("effective").text if info.find("effective") else ""
-        link = soup.find("identifier").text if soup.find("identifier") else ""
-
-        feed.append({
-            "time": effective,
-            "title": headline,
+
+def polygon_key(p: Dict) -> str:
+    """Stable identity for a warning polygon across snapshots."""
+    ring = p.get("polygon") or []
+    return f"{p.get('identifier')}|{p.get('headline')}|{p.get('title')}|{len(ring)}|{ring[:1]}"
+
+
+def get_bom_feed(snapshot: Optional[BomSnapshot] = None):
+    """BOM warning feed items for list display (from the cached snapshot unless one is given)."""
+    if snapshot is None:
+        snapshot = get_bom_snapshot()
+    return [
+        {
+            "time": w["effective"],
+            "title": w["headline"],
             "summary": "Issued by Bureau of Meteorology",
-            "url": "http://www.bom.gov.au/nsw/warnings/"
-        })
+            "url": "http://www.bom.gov.au/nsw/warnings/",
+        }
+        for w in snapshot.warnings
+    ]
+
+
+# --- Parsing -----------------------------------------------------------------
+
+def _local(tag) -> str:
+    # CAP files may or may not be namespaced; compare on the local name only
+    return etree.QName(tag).localname if isinstance(tag, str) else ""
+
+
+def _child_text(el, name: str) -> Optional[str]:
+    for child in el:
+        if _local(child.tag) == name:
+            return (child.text or "").strip()
+    return None
+
+
+def _parse_polygon(text: str) -> List[List[float]]:
+    """CAP polygons are space-separated "lat,lon" pairs; return [[lon, lat], ...]."""
+    coords = []
+    for pair in (text or "").split():
+        try:
+            lat, lon = pair.split(",")
+            coords.append([float(lon), float(lat)])
+        except ValueError:
+            continue
+    return coords
+
+
+def parse_bom_cap(content: bytes) -> BomSnapshot:
+    """
+    Stream-parse a CAP warnings document into a BomSnapshot.
+    Elements are cleared as soon as each <info> block is consumed, so memory
+    stays flat regardless of how many warning areas the file carries.
+    """
+    snapshot = BomSnapshot()
+    identifier = ""
+
+    for _, el in etree.iterparse(BytesIO(content), events=("end",), recover=True):
+        name = _local(el.tag)
+
+        if name == "identifier":
+            identifier = (el.text or "").strip()
+        elif name == "info":
+            headline = _child_text(el, "headline") or "BOM Warning"
+            effective = _child_text(el, "effective") or ""
+            snapshot.warnings.append({
+                "identifier": identifier,
+                "headline": headline,
+                "effective": effective,
+                "expires": _child_text(el, "expires") or "",
+                "event": _child_text(el, "event") or "",
+            })
+
+            for area in el:
+                if _local(area.tag) != "area":
+                    continue
+                title = _child_text(area, "areaDesc") or "BOM Area"
+                for poly in area:
+                    if _local(poly.tag) != "polygon":
+                        continue
+                    coords = _parse_polygon(poly.text)
+                    if coords:
+                        snapshot.polygons.append({
+                            "polygon": coords,
+                            "fill_r": 255, "fill_g": 165, "fill_b": 0,  # orange
+                            "title": title,
+                            "headline": headline,
+                            "effective": effective,
+                            "identifier": identifier,
+                        })
+            el.clear()
+        elif name == "alert":
+            el.clear()
 
-    update_cache_time("BOM warnings (CAP)")
-    return feed
\ No newline at end of file
+    return snapshot
@@ -1,3 +1,206 @@
-# NASA FIRMS hotspots (optional) — real impl later
-def get_firms_points():
-    return []
+import csv
+import datetime as dt
+import os
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from cachetools import TTLCache
+
+from src import http_client, metrics
+from src.snapshot_store import load_snapshot, save_snapshot
+from src.utils_cache import notify_refresh, single_flight, update_cache_time
+
+SOURCE = "NASA FIRMS hotspots"
+
+# FIRMS area API: /api/area/csv/{MAP_KEY}/{SOURCE}/{west,south,east,north}/{DAY_RANGE}
+FIRMS_AREA_URL = "https://firms.modaps.eosdis.nasa.gov/api/area/csv/{key}/{source}/{bbox}/{days}"
+NSW_BBOX = "140.9,-37.6,153.7,-28.1"
+
+# VIIRS reports l/n/h; MODIS reports 0–100. Map both onto the MODIS scale.
+_VIIRS_CONFIDENCE = {"l": 15, "low": 15, "n": 55, "nominal": 55, "h": 90, "high": 90}
+MIN_CONFIDENCE = 30   # drops "low" detections
+_REQUIRED_COLUMNS = ("latitude", "longitude", "acq_date", "acq_time")
+MAX_AGE_HOURS = 24
+
+# cache results for 30 minutes
+_cache = TTLCache(maxsize=1, ttl=1800)
+
+
+@dataclass(frozen=True)
+class Hotspots:
+    """
+    Columnar hotspot set: one NumPy array per attribute, row i is hotspot i.
+    The cached instance is shared by every session, so its arrays are made
+    read-only on construction.
+    """
+    lat: np.ndarray = field(default_factory=lambda: np.empty(0))
+    lon: np.ndarray = field(default_factory=lambda: np.empty(0))
+    frp: np.ndarray = field(default_factory=lambda: np.empty(0, np.float32))        # fire radiative power, MW
+    acq_time: np.ndarray = field(default_factory=lambda: np.empty(0, np.int64))     # unix epoch seconds (UTC)
+    confidence: np.ndarray = field(default_factory=lambda: np.empty(0, np.uint8))   # 0–100
+
+    def __post_init__(self):
+        for name in ("lat", "lon", "frp", "acq_time", "confidence"):
+            getattr(self, name).setflags(write=False)
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Layer-ready frame (lat, lon, weight) without building per-row dicts."""
+        return pd.DataFrame({"lat": self.lat, "lon": self.lon, "weight": self.frp})
+
+    def to_payload(self) -> Dict[str, list]:
+        return {k: getattr(self, k).tolist() for k in ("lat", "lon", "frp", "acq_time", "confidence")}
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, list]) -> "Hotspots":
+        return cls(
+            lat=np.asarray(payload.get("lat", []), dtype=float),
+            lon=np.asarray(payload.get("lon", []), dtype=float),
+            frp=np.asarray(payload.get("frp", []), dtype=np.float32),
+            acq_time=np.asarray(payload.get("acq_time", []), dtype=np.int64),
+            confidence=np.asarray(payload.get("confidence", []), dtype=np.uint8),
+        )
+
+
+# last successful snapshot; outlives the TTL so a failed refresh can fall back to it
+_last_good: Optional[Hotspots] = None
+
+
+def get_firms_points() -> Hotspots:
+    """Recent NSW hotspots (cached snapshot). Empty unless FIRMS is configured."""
+    if "points" in _cache:
+        metrics.cache_lookup("firms", True)
+        return _cache["points"]
+    metrics.cache_lookup("firms", False)
+    with single_flight(SOURCE):
+        if "points" in _cache:
+            return _cache["points"]
+        return refresh_firms_points(reuse_within=_cache.ttl)
+
+
+def refresh_firms_points(reuse_within: float = 0) -> Hotspots:
+    """
+    Fetch + parse now and replace the cached snapshot (keeps the old one on error).
+    Configure with FIRMS_MAP_KEY (and optionally FIRMS_SOURCE, FIRMS_DAY_RANGE),
+    or point FIRMS_CSV_PATH at a local area CSV for offline use.
+    """
+    global _last_good
+    saved = load_snapshot(SOURCE, max_age_s=reuse_within) if reuse_within else None
+    if saved is not None:
+        payload, fetched_at = saved
+        hotspots = Hotspots.from_payload(payload)
+        update_cache_time(SOURCE, fetched_at)
+        _cache["points"] = _last_good = hotspots
+        notify_refresh(SOURCE, hotspots)
+        return hotspots
+
+    since = time.time() - MAX_AGE_HOURS * 3600
+    path = os.getenv("FIRMS_CSV_PATH", "").strip()
+    key = os.getenv("FIRMS_MAP_KEY", "").strip()
+    try:
+        if path:
+            with open(path, newline="", encoding="utf-8") as fh, \
+                    metrics.timer("feed_parse_seconds", source=SOURCE):
+                hotspots = parse_firms_csv(fh, since=since)
+        elif key:
+            url = FIRMS_AREA_URL.format(
+                key=key,
+                source=os.getenv("FIRMS_SOURCE", "VIIRS_SNPP_NRT"),
+                bbox=NSW_BBOX,
+                days=os.getenv("FIRMS_DAY_RANGE", "1"),
+            )
+            resp = http_client.get(url, timeout=30, stream=True, source=SOURCE)
+            resp.raise_for_status()
+            # with no charset known, iter_lines(decode_unicode=True) yields bytes
+            resp.encoding = resp.encoding or "utf-8"
+            # streamed: parse time here includes reading the body off the wire
+            try:
+                with metrics.timer("feed_parse_seconds", source=SOURCE):
+                    hotspots = parse_firms_csv(resp.iter_lines(decode_unicode=True), since=since)
+            finally:
+                resp.close()
+        else:
+            hotspots = Hotspots()
+    except Exception as e:
+        metrics.inc("feed_errors_total", source=SOURCE)
+        print("Error fetching FIRMS hotspots:", e)
+        return _last_good if _last_good is not None else Hotspots()
+
+    if path or key:
+        update_cache_time(SOURCE)
+        save_snapshot(SOURCE, hotspots.to_payload())
+        notify_refresh(SOURCE, hotspots)
+    _cache["points"] = _last_good = hotspots
+    return hotspots
+
+
+# --- Parsing -----------------------------------------------------------------
+
+def parse_firms_csv(lines: Iterable[str],
+                    min_confidence: int = MIN_CONFIDENCE,
+                    since: Optional[float] = None) -> Hotspots:
+    """
+    Incrementally parse a FIRMS area CSV (VIIRS or MODIS) into Hotspots.
+    Rows are appended straight into typed arrays, so memory is a few bytes
+    per hotspot instead of a dict per row. Rows below min_confidence or
+    acquired before `since` (unix seconds) are skipped, as are malformed rows.
+    Raises ValueError if the header lacks a position or acquisition column.
+    """
+    lat, lon, frp = array("d"), array("d"), array("f")
+    acq, conf = array("q"), array("B")
+    day_epoch: Dict[str, int] = {}  # acq_date -> midnight UTC, parsed once per date
+
+    reader = csv.reader(line for line in lines if line)
+    header = next(reader, None)
+    if not header:
+        return Hotspots()
+    col = {name.strip().lower(): i for i, name in enumerate(header)}
+    missing = [c for c in _REQUIRED_COLUMNS if c not in col]
+    if missing:
+        # e.g. an "Invalid MAP_KEY." body; raising keeps the last good snapshot
+        raise ValueError(f"FIRMS CSV is missing column(s): {', '.join(missing)}")
+    i_lat, i_lon = col["latitude"], col["longitude"]
+    i_date, i_time = col["acq_date"], col["acq_time"]
+    i_conf, i_frp = col.get("confidence"), col.get("frp")
+
+    for row in reader:
+        try:
+            c_raw = row[i_conf].strip().lower() if i_conf is not None else "n"
+            c = _VIIRS_CONFIDENCE.get(c_raw)
+            if c is None:
+                c = int(float(c_raw))
+            if c < min_confidence:
+                continue
+
+            date = row[i_date]
+            if date not in day_epoch:
+                day_epoch[date] = int(dt.datetime.strptime(date, "%Y-%m-%d")
+                                      .replace(tzinfo=dt.timezone.utc).timestamp())
+            hhmm = int(row[i_time])
+            t = day_epoch[date] + (hhmm // 100) * 3600 + (hhmm % 100) * 60
+            if since is not None and t < since:
+                continue
+
+            y, x = float(row[i_lat]), float(row[i_lon])
+            f = float(row[i_frp]) if i_frp is not None and row[i_frp] else 0.0
+        except (IndexError, ValueError):
+            continue
+        lat.append(y)
+        lon.append(x)
+        frp.append(f)
+        acq.append(t)
+        conf.append(max(0, min(100, c)))
+
+    return Hotspots(
+        lat=np.frombuffer(lat, dtype=np.float64),
+        lon=np.frombuffer(lon, dtype=np.float64),
+        frp=np.frombuffer(frp, dtype=np.float32),
+        acq_time=np.frombuffer(acq, dtype=np.int64),
+        confidence=np.frombuffer(conf, dtype=np.uint8),
+    )
@@ -1,22 +1,77 @@
-import requests
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
 from cachetools import TTLCache
-from src.utils_cache import update_cache_time
+from src import http_client, metrics
+from src.snapshot_store import load_snapshot, save_snapshot
+from src.utils_cache import update_cache_time, single_flight, notify_refresh
+
+SOURCE = "NSW RFS incidents"
 
 # cache results for 15 minutes
 _cache = TTLCache(maxsize=1, ttl=900)
 
+# last good snapshot (outlives the TTL cache: diff base and error fallback) and the latest diff
+_previous: Optional[List[Dict]] = None
+_changes = None
+
+
+@dataclass
+class RfsChanges:
+    """What changed between two consecutive RFS snapshots, keyed by incident guid."""
+    new: List[Dict] = field(default_factory=list)
+    updated: List[Dict] = field(default_factory=list)
+    escalated: List[Dict] = field(default_factory=list)  # subset of updated that got more severe
+    closed: List[Dict] = field(default_factory=list)     # last known record of incidents that disappeared
+    at: float = 0.0                                      # unix time the diff was taken
+
+    def __bool__(self) -> bool:
+        return bool(self.new or self.updated or self.closed)
+
+    @property
+    def changed(self) -> List[Dict]:
+        """Incidents a consumer should (re)process: new, updated and closed."""
+        return self.new + self.updated + self.closed
+
+    def guids(self, kind: str) -> set:
+        return {p["guid"] for p in getattr(self, kind)}
+
 def get_rfs_points():
-    """Fetch NSW RFS incidents as point features for mapping."""
+    """NSW RFS incidents as point features for mapping (cached snapshot)."""
     if "points" in _cache:
+        metrics.cache_lookup("rfs", True)
         return _cache["points"]
+    metrics.cache_lookup("rfs", False)
+    with single_flight(SOURCE):
+        # another session may have refreshed while we waited
+        if "points" in _cache:
+            return _cache["points"]
+        return refresh_rfs_points(reuse_within=_cache.ttl)
+
+def refresh_rfs_points(reuse_within: float = 0):
+    """
+    Fetch the feed now and replace the cached snapshot (keeps the old one on error).
+    If a snapshot saved on disk (by this or another worker) is younger than
+    reuse_within seconds, adopt it instead of going upstream.
+    """
+    saved = load_snapshot(SOURCE, max_age_s=reuse_within) if reuse_within else None
+    if saved is not None:
+        points, fetched_at = saved
+        update_cache_time(SOURCE, fetched_at)
+        _cache["points"] = points
+        _record_changes(points)
+        return points
 
     url = "https://www.rfs.nsw.gov.au/feeds/majorIncidents.json"
     try:
-        resp = requests.get(url, timeout=10)
+        resp = http_client.get(url, timeout=10, source=SOURCE)
+        t0 = time.perf_counter()
         data = resp.json()
     except Exception as e:
+        metrics.inc("feed_errors_total", source=SOURCE)
         print("Error fetching RFS incidents:", e)
-        return []
+        return _previous if _previous is not None else []
 
     points = []
     for item in data.get("features", []):
@@ -37,28 +92,86 @@ def get_rfs_points():
 
         if coords and len(coords) == 2:
             points.append({
+                "guid": props.get("guid") or props.get("link") or f"{props.get('title')}@{coords[0]},{coords[1]}",
                 "lat": coords[1],
                 "lon": coords[0],
                 "title": props.get("title", "Unknown"),
                 "status": status,
+                "category": props.get("category", ""),   # alert level, e.g. "Watch and Act"
                 "updated": props.get("updated", ""),
                 "url": props.get("link", ""),
                 "source": "NSW RFS"
             })
+    metrics.observe("feed_parse_seconds", time.perf_counter() - t0, source=SOURCE)
 
     # 🟢 Tell cache system that RFS feed is now updated
-    update_cache_time("NSW RFS incidents")
+    update_cache_time(SOURCE)
+    _record_changes(points)  # before saving: a cold start diffs against the stored snapshot
+    save_snapshot(SOURCE, points)
 
     _cache["points"] = points
     return points
 
 
-def get_rfs_feed():
-    """Simplified feed list for sidebar/feed page."""
-    points = get_rfs_points()
+def get_rfs_changes() -> RfsChanges:
+    """The diff produced by the most recent refresh (empty before the first one)."""
+    get_rfs_points()
+    return _changes or RfsChanges()
+
+
+# --- Incremental diffing -----------------------------------------------------
+
+_STATUS_RANK = (("out of control", 3), ("being controlled", 2), ("under control", 1))
+_ALERT_RANK = {"emergency warning": 3, "watch and act": 2, "advice": 1}
+_COMPARED = ("lat", "lon", "title", "status", "category", "updated")
+
+
+def _severity(p: Dict):
+    s = (p.get("status") or "").lower()
+    status_rank = next((r for key, r in _STATUS_RANK if key in s), 0)
+    return _ALERT_RANK.get((p.get("category") or "").strip().lower(), 0), status_rank
+
+
+def diff_incidents(previous: List[Dict], current: List[Dict]) -> RfsChanges:
+    """Compare two snapshots by guid: new, updated (and escalated), closed."""
+    before = {p.get("guid"): p for p in previous or []}
+    after = {p.get("guid"): p for p in current or []}
+    changes = RfsChanges(at=time.time())
+    for guid, p in after.items():
+        old = before.get(guid)
+        if old is None:
+            changes.new.append(p)
+        elif any(old.get(k) != p.get(k) for k in _COMPARED):
+            changes.updated.append(p)
+            if _severity(p) > _severity(old):
+                changes.escalated.append(p)
+    changes.closed = [p for guid, p in before.items() if guid not in after]
+    return changes
+
+
+def _record_changes(points: List[Dict]):
+    global _previous, _changes
+    previous = _previous
+    if previous is None:
+        # cold start: diff against the last persisted snapshot, if any
+        saved = load_snapshot(SOURCE)
+        previous = saved[0] if saved is not None and saved[0] is not points else []
+    if previous is points:
+        return
+    _changes = diff_incidents(previous, points)
+    _previous = points
+    if _changes:
+        notify_refresh(SOURCE, _changes)
+
+
+def get_rfs_feed(points: Optional[List[Dict]] = None):
+    """Simplified feed list for sidebar/feed page (from the cached snapshot unless points are given)."""
+    if points is None:
+        points = get_rfs_points()
     feed = []
     for p in points:
         feed.append({
+            "guid": p.get("guid"),
             "time": p["updated"],
             "title": p["title"],
             "summary": f"Status: {p['status']}",
@@ -0,0 +1,123 @@
+import csv
+import re
+from dataclasses import dataclass
+from difflib import get_close_matches
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src import metrics
+
+# Bundled offline list of NSW towns/suburbs (name, postcode, lat, lon).
+GAZETTEER_PATH = Path(__file__).resolve().parent.parent / "nsw_gazetteer.csv"
+
+# trailing qualifiers people type that Nominatim tolerates but our keys don't carry
+_SUFFIXES = re.compile(r"\b(new south wales|nsw|australia|au)\b")
+_POSTCODE = re.compile(r"\b(2\d{3})\b")
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    postcode: str
+    lat: float
+    lon: float
+    district: Optional[str]  # AFDRS fire-weather district, if resolvable
+
+
+def normalize_place(text: str) -> str:
+    """Lowercase, drop state/country qualifiers, postcodes and punctuation."""
+    t = (text or "").lower()
+    t = _POSTCODE.sub(" ", t)
+    t = _SUFFIXES.sub(" ", t)
+    t = re.sub(r"[^a-z0-9 ]+", " ", t)
+    return " ".join(t.split())
+
+
+class Gazetteer:
+    """
+    In-memory place index: exact name/postcode dicts, a character trie for
+    prefix completion, and difflib fuzzy matching as the last resort.
+    """
+
+    def __init__(self, places: List[Place]):
+        self.places = places
+        self._by_name: Dict[str, Place] = {}
+        self._by_postcode: Dict[str, List[Place]] = {}
+        self._trie: Dict = {}
+        for p in places:
+            key = normalize_place(p.name)
+            self._by_name.setdefault(key, p)
+            self._by_postcode.setdefault(p.postcode, []).append(p)
+            node = self._trie
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node.setdefault("", []).append(p)  # "" marks a terminal node
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    def lookup(self, query: str, fuzzy: bool = True) -> Optional[Place]:
+        """Best single match for free text like 'Bega', 'bega nsw 2550' or '2550'."""
+        key = normalize_place(query)
+        if key in self._by_name:
+            return self._by_name[key]
+
+        m = _POSTCODE.search(query or "")
+        if m and m.group(1) in self._by_postcode:
+            candidates = self._by_postcode[m.group(1)]
+            # prefer the town named alongside the postcode, if any
+            for p in candidates:
+                if key and normalize_place(p.name) == key:
+                    return p
+            if not key:
+                return candidates[0]
+
+        if fuzzy and key:
+            close = get_close_matches(key, self._by_name.keys(), n=1, cutoff=0.85)
+            if close:
+                return self._by_name[close[0]]
+        return None
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Place]:
+        """Places whose normalised name starts with prefix (alphabetical)."""
+        node = self._trie
+        for ch in normalize_place(prefix):
+            node = node.get(ch)
+            if node is None:
+                return []
+        out: List[Place] = []
+        stack = [node]
+        while stack and len(out) < limit:
+            n = stack.pop()
+            out.extend(n.get("", []))
+            # push children in reverse so they pop in alphabetical order
+            stack.extend(n[ch] for ch in sorted((c for c in n if c), reverse=True))
+        return out[:limit]
+
+
+@lru_cache(maxsize=1)
+def load_gazetteer() -> Gazetteer:
+    """Load the bundled gazetteer once per process (empty if the file is missing)."""
+    from src.location import detect_district  # local import: location uses this module
+
+    places: List[Place] = []
+    try:
+        with open(GAZETTEER_PATH, newline="", encoding="utf-8") as fh:
+            for row in csv.DictReader(fh):
+                try:
+                    lat, lon = float(row["lat"]), float(row["lon"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                places.append(Place(
+                    name=(row.get("name") or "").strip(),
+                    postcode=(row.get("postcode") or "").strip(),
+                    lat=lat, lon=lon,
+                    district=detect_district(lat, lon),
+                ))
+    except OSError as e:
+        print("Gazetteer load error:", e)
+    return Gazetteer(places)
+
+
+metrics.watch_lru("gazetteer", load_gazetteer)
@@ -1,39 +1,30 @@
+import json
+
 import pydeck as pdk
+from pydeck.bindings.json_tools import default_serialize
 
-def to_pydeck_layer_points(records, name="Points", heat=False):
-    if not records:
-        return []
-    if heat:
-        return [pdk.Layer(
-            "HeatmapLayer",
-            data=records,
-            get_position='[lon, lat]',
-            get_weight='weight',
-            aggregation='MEAN',
-            opacity=0.4
-        )]
+class CompactDeck(pdk.Deck):
+    """
+    pdk.Deck serialised without pydeck's indent=2 pretty-printing, which puts
+    every coordinate of every polygon on its own line. st.pydeck_chart sends
+    this JSON to the browser on each rerun, so whitespace is most of the payload.
+    """
 
-    # Assign a color per record based on status (simple + readable)
-    for r in records:
-        s = (r.get("status") or "").lower()
-        if "out of control" in s:
-            r["color"] = [230, 57, 70]      # red
-        elif "being controlled" in s:
-            r["color"] = [255, 165, 0]      # orange
-        else:
-            r["color"] = [34, 139, 34]      # green
+    def to_json(self):
+        return json.dumps(self, sort_keys=True, default=default_serialize, separators=(",", ":"))
 
-    return [pdk.Layer(
-        "ScatterplotLayer",
-        data=records,
-        get_position='[lon, lat]',
-        get_radius=4500,         # larger for visibility at zoom ~5 (accessibility)
-        filled=True,
-        pickable=True,
-        get_fill_color='color',
-        get_line_color=[30, 30, 30],
-        line_width_min_pixels=1,
-    )]
+def incident_color(status, title=""):
+    """RGB for an RFS incident, from its status text (shared by map and exports)."""
+    s = (status or "").strip().lower()
+    if "out of control" in s:
+        return [230, 57, 70]           # red
+    if "being controlled" in s or "contained" in s:
+        return [255, 165, 0]           # orange
+    if "burn" in s or "burn" in (title or "").lower():
+        return [66, 135, 245]          # blue (planned burn / burn activity)
+    if not s or "no official status" in s or s == "unknown":
+        return [128, 128, 128]         # grey
+    return [34, 139, 34]               # green (advice/other)
 
 def to_pydeck_layer_polygons(polys, name="Polygons"):
     if not polys:
@@ -0,0 +1,110 @@
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from cachetools import LRUCache
+from requests.adapters import HTTPAdapter
+
+from src import metrics
+
+USER_AGENT = "Outback_Early_Warning/1.0"
+
+# one keep-alive session per process; urllib3 pools connections per host
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+# last 200 response per URL that carried validators (ETag / Last-Modified)
+_validated = LRUCache(maxsize=64)
+_validated_lock = threading.Lock()
+_VALIDATOR_HEADERS = ("if-none-match", "if-modified-since")
+
+
+def get_session() -> requests.Session:
+    """Return the shared pooled session (created on first use)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                s.headers.update({
+                    "User-Agent": USER_AGENT,
+                    "Accept-Encoding": "gzip, deflate",
+                })
+                _session = s
+    return _session
+
+
+def get(url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: float = 10,
+        conditional: bool = True,
+        stream: bool = False,
+        source: Optional[str] = None) -> requests.Response:
+    """
+    GET through the shared session.
+    With conditional=True the previous response's ETag / Last-Modified are sent
+    back; on 304 Not Modified the cached response (body already read) is
+    returned instead, so callers can treat it exactly like a fresh 200.
+    stream=True leaves the body unread for incremental parsing (never cached).
+    source labels the request metrics (defaults to the host name).
+    """
+    source = source or urlsplit(url).hostname or "unknown"
+    if stream:
+        return _timed_get(source, url, params=params, headers=headers, timeout=timeout, stream=True)
+
+    key = url + ("?" + urlencode(sorted(params.items())) if params else "")
+    hdrs = dict(headers or {})
+
+    cached = None
+    if conditional:
+        with _validated_lock:
+            cached = _validated.get(key)
+        if cached is not None:
+            if cached.headers.get("ETag"):
+                hdrs["If-None-Match"] = cached.headers["ETag"]
+            if cached.headers.get("Last-Modified"):
+                hdrs["If-Modified-Since"] = cached.headers["Last-Modified"]
+
+    resp = _timed_get(source, url, params=params, headers=hdrs, timeout=timeout)
+
+    if conditional:
+        metrics.cache_lookup("http_validated", resp.status_code == 304 and cached is not None)
+    if resp.status_code == 304:
+        if cached is not None:
+            return cached
+        # 304 with nothing to reuse (validator evicted, or a caller/proxy validator):
+        # ask once more for the full body
+        hdrs = {k: v for k, v in hdrs.items() if k.lower() not in _VALIDATOR_HEADERS}
+        hdrs["Cache-Control"] = "no-cache"
+        resp = _timed_get(source, url, params=params, headers=hdrs, timeout=timeout)
+
+    if conditional and resp.status_code == 200 and (
+        resp.headers.get("ETag") or resp.headers.get("Last-Modified")
+    ):
+        with _validated_lock:
+            _validated[key] = resp
+
+    return resp
+
+
+def _timed_get(source: str, url: str, stream: bool = False, **kwargs) -> requests.Response:
+    """session.get, recording latency, status and body size per source."""
+    t0 = time.perf_counter()
+    try:
+        resp = get_session().get(url, stream=stream, **kwargs)
+    except Exception:
+        metrics.inc("http_errors_total", source=source)
+        raise
+    metrics.observe("http_request_seconds", time.perf_counter() - t0, source=source)
+    metrics.inc("http_responses_total", source=source, code=resp.status_code)
+    # a streamed body isn't read yet; fall back to the declared length
+    size = resp.headers.get("Content-Length") if stream else len(resp.content)
+    if size is not None:
+        metrics.observe("http_response_bytes", float(size), buckets=metrics.BYTES_BUCKETS, source=source)
+    return resp
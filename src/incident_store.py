@@ -0,0 +1,138 @@
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.feed_index import parse_time
+from src.geo_utils import incident_color
+from src.utils_cache import memo_per_snapshot
+
+# Columnar, read-only view of one RFS snapshot. Built once per snapshot and
+# shared by every session, so nothing downstream may write to it: arrays are
+# flagged read-only and styling is precomputed here instead of being patched
+# onto the cached record dicts on each rerun.
+
+# severity rank used to pick a cluster's status (lower = worse)
+OUT_OF_CONTROL, BEING_CONTROLLED, UNDER_CONTROL, OTHER, NO_STATUS = range(5)
+_SEVERITY_TERMS = (("out of control", OUT_OF_CONTROL), ("being controlled", BEING_CONTROLLED),
+                   ("under control", UNDER_CONTROL))
+
+FRAME_COLUMNS = ["lat", "lon", "title", "status", "updated", "source", "count", "r", "g", "b"]
+
+
+def severity(status: str) -> int:
+    s = (status or "").strip().lower()
+    if not s:
+        return NO_STATUS
+    return next((rank for term, rank in _SEVERITY_TERMS if term in s), OTHER)
+
+
+@dataclass(frozen=True)
+class StringColumn:
+    """Interned strings: one table of distinct values plus an int32 code per row."""
+    codes: np.ndarray   # int32 per row
+    table: np.ndarray   # object array of distinct str values
+
+    @classmethod
+    def build(cls, values: Sequence[str]) -> "StringColumn":
+        ids: Dict[str, int] = {}
+        codes = np.fromiter((ids.setdefault(v, len(ids)) for v in values), dtype=np.int32, count=len(values))
+        table = np.empty(len(ids), dtype=object)
+        table[:] = list(ids)
+        return cls(_frozen(codes), _frozen(table))
+
+    def __getitem__(self, i: int) -> str:
+        return self.table[self.codes[i]]
+
+    def take(self, idx: np.ndarray) -> np.ndarray:
+        return self.table[self.codes[idx]]
+
+
+def _frozen(a: np.ndarray) -> np.ndarray:
+    a.flags.writeable = False
+    return a
+
+
+@dataclass(frozen=True)
+class IncidentStore:
+    lat: np.ndarray            # float64
+    lon: np.ndarray            # float64
+    severity: np.ndarray       # uint8, see OUT_OF_CONTROL..NO_STATUS
+    color: np.ndarray          # uint8 (n, 3), incident_color() per row
+    guid: StringColumn
+    title: StringColumn
+    status: StringColumn
+    category: StringColumn
+    updated: StringColumn
+    url: StringColumn
+    updated_ts: np.ndarray     # float64 unix seconds of `updated`, NaN if it didn't parse
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> "IncidentStore":
+        """Columns for every record with usable coordinates (same filter as the map/export)."""
+        rows = []
+        for r in records or []:
+            try:
+                lat, lon = float(r.get("lat")), float(r.get("lon"))
+            except (TypeError, ValueError):
+                continue
+            rows.append((lat, lon, r))
+        n = len(rows)
+
+        def col(key: str) -> StringColumn:
+            return StringColumn.build([str(r.get(key) or "") for _, _, r in rows])
+
+        # colour depends on (status, title) only; memoise across repeated statuses
+        palette: Dict[Tuple[str, bool], Tuple[int, int, int]] = {}
+        color = np.empty((n, 3), dtype=np.uint8)
+        for i, (_, _, r) in enumerate(rows):
+            status, title = r.get("status") or "", r.get("title") or ""
+            key = (status, "burn" in title.lower())
+            if key not in palette:
+                palette[key] = tuple(incident_color(status, title))
+            color[i] = palette[key]
+
+        updated = col("updated")
+        # parse each distinct timestamp once; raw strings like d/m/Y don't sort by time
+        parsed = [parse_time(v) for v in updated.table]
+        table_ts = np.array([t.timestamp() if t else np.nan for t in parsed], dtype=float)
+
+        return cls(
+            lat=_frozen(np.fromiter((lat for lat, _, _ in rows), dtype=float, count=n)),
+            lon=_frozen(np.fromiter((lon for _, lon, _ in rows), dtype=float, count=n)),
+            severity=_frozen(np.fromiter((severity(r.get("status")) for _, _, r in rows),
+                                         dtype=np.uint8, count=n)),
+            color=_frozen(color),
+            guid=col("guid"),
+            title=col("title"),
+            status=col("status"),
+            category=col("category"),
+            updated=updated,
+            url=col("url"),
+            updated_ts=_frozen(table_ts[updated.codes]),
+        )
+
+    def to_frame(self, idx: np.ndarray = None) -> pd.DataFrame:
+        """Layer-ready rows (all, or the given positions); a fresh frame each call."""
+        if idx is None:
+            idx = np.arange(len(self))
+        color = self.color[idx]
+        return pd.DataFrame({
+            "lat": self.lat[idx],
+            "lon": self.lon[idx],
+            "title": self.title.take(idx),
+            "status": self.status.take(idx),
+            "updated": self.updated.take(idx),
+            "source": pd.Categorical(["NSW RFS"] * len(idx)),
+            "count": np.ones(len(idx), dtype=np.int32),
+            "r": color[:, 0], "g": color[:, 1], "b": color[:, 2],
+        }, columns=FRAME_COLUMNS)
+
+
+def get_incident_store(points: List[Dict]) -> IncidentStore:
+    """IncidentStore for an RFS snapshot (get_rfs_points()), built once per snapshot."""
+    return memo_per_snapshot("store:rfs", points, IncidentStore.from_records)
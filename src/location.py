@@ -1,23 +1,40 @@
-import requests
+from src import http_client
+from src.districts import load_district_index
+from src.gazetteer import load_gazetteer
+from src.snapshot_store import kv_get, kv_put
 
 def geocode_nominatim(query: str):
-    """Return (lat, lon, display_name) using OSM Nominatim."""
+    """
+    Return (lat, lon, display_name). The bundled NSW gazetteer answers first;
+    OSM Nominatim is only called for places it doesn't know.
+    """
+    place = load_gazetteer().lookup(query)
+    if place:
+        return place.lat, place.lon, f"{place.name} NSW {place.postcode}"
+
+    key = query.strip().lower()
+    hit = kv_get("geocode_nominatim", key)
+    if hit:
+        return tuple(hit)
+
     url = "https://nominatim.openstreetmap.org/search"
     params = {"q": query + ", NSW, Australia", "format": "json", "limit": 1}
     try:
-        r = requests.get(url, params=params, headers={"User-Agent": "Outback_Early_Warning"}, timeout=10)
+        r = http_client.get(url, params=params, timeout=10)
         r.raise_for_status()
         js = r.json()
         if not js:
             return None
         lat = float(js[0]["lat"]); lon = float(js[0]["lon"]); name = js[0]["display_name"]
+        kv_put("geocode_nominatim", key, [lat, lon, name])
         return lat, lon, name
     except Exception as e:
         print("Geocode error:", e)
         return None
 
 
-# Very rough NSW AFDRS district bounding boxes for a demo-grade auto-detect.
+# Very rough NSW AFDRS district bounding boxes. Lookups use the polygon index in
+# src/districts.py; these are only the fallback if the boundaries file is missing.
 # Each entry: name, lat_min, lat_max, lon_min, lon_max
 AFDRS_BBOXES = [
     ("Greater Sydney",              -34.30, -32.80, 149.50, 151.50),
@@ -38,6 +55,16 @@ AFDRS_BBOXES = [
 ]
 
 def detect_district(lat: float, lon: float) -> str | None:
+    return detect_districts([lat], [lon])[0]
+
+def detect_districts(lats, lons) -> list[str | None]:
+    """Resolve AFDRS districts for many points at once (grid + polygon index)."""
+    index = load_district_index()
+    if len(index):
+        return index.lookup_many(lats, lons)
+    return [_detect_district_bbox(lat, lon) for lat, lon in zip(lats, lons)]
+
+def _detect_district_bbox(lat: float, lon: float) -> str | None:
     for name, la_min, la_max, lo_min, lo_max in AFDRS_BBOXES:
         if la_min <= lat <= la_max and lo_min <= lon <= lo_max:
             return name
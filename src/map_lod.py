@@ -0,0 +1,277 @@
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import shapely
+from cachetools import LRUCache
+
+from src import metrics
+from src.geo_utils import incident_color
+from src.incident_store import IncidentStore, get_incident_store
+from src.spatial_index import polygon_rings
+from src.utils_cache import memo_per_snapshot
+
+BBox = Tuple[float, float, float, float]  # (west, south, east, north)
+
+# Douglas-Peucker tolerance (degrees) per zoom band; None = full resolution.
+# Roughly one screen pixel at the lowest zoom of each band.
+_TOLERANCES = ((5, 0.02), (7, 0.005), (9, 0.001), (11, 0.0002))
+CLUSTER_BELOW_ZOOM = 8     # group incidents into grid clusters below this zoom
+HEAT_BIN_BELOW_ZOOM = 9    # pre-aggregate hotspots into bins below this zoom
+
+# Layer data goes to the browser as JSON text, so coordinates are rounded to
+# what the detail level can show: 5 dp is ~1 m, 4 dp ~10 m, 3 dp ~100 m.
+POINT_DECIMALS = 5
+HOTSPOT_DECIMALS = 4          # VIIRS pixels are ~375 m
+_POLYGON_KEYS = ("title", "headline")  # all the polygon layer and tooltip read
+
+# preset viewports for the Map page (lat, lon, zoom)
+VIEWS: Dict[str, Tuple[float, float, float]] = {
+    "All NSW": (-32.5, 147.0, 5),
+    "Greater Sydney": (-33.8, 150.9, 8),
+    "Hunter": (-32.6, 151.3, 8),
+    "North Coast": (-29.6, 152.9, 7.5),
+    "New England": (-30.3, 151.4, 7.5),
+    "Central West": (-33.0, 148.6, 7.5),
+    "South Coast": (-35.9, 150.0, 7.5),
+    "Riverina": (-34.9, 146.5, 7.5),
+    "Far West": (-31.8, 142.5, 6.5),
+}
+
+
+def tolerance_for_zoom(zoom: float) -> Optional[float]:
+    for max_zoom, tol in _TOLERANCES:
+        if zoom < max_zoom:
+            return tol
+    return None
+
+
+def decimals_for_tolerance(tol: Optional[float]) -> int:
+    """Coordinate decimals that keep rounding error below a tenth of the simplification tolerance."""
+    if tol is None:
+        return POINT_DECIMALS
+    return min(POINT_DECIMALS, max(3, math.ceil(-math.log10(tol)) + 1))
+
+
+def bbox_for_view(lat: float, lon: float, zoom: float,
+                  width_px: int = 1200, height_px: int = 700, pad: float = 0.25) -> BBox:
+    """Approximate Web Mercator viewport bounds, padded so small pans stay covered."""
+    deg_per_px = 360.0 / (256 * 2 ** zoom)
+    half_w = width_px * deg_per_px * (1 + pad) / 2
+    half_h = height_px * deg_per_px * math.cos(math.radians(lat)) * (1 + pad) / 2
+    return (lon - half_w, lat - half_h, lon + half_w, lat + half_h)
+
+
+def _band(zoom: float) -> int:
+    # half-zoom steps: enough to change detail visibly, few enough to cache well
+    return int(math.floor(zoom * 2))
+
+
+def _bbox_key(bbox: BBox) -> Tuple[float, ...]:
+    return tuple(round(v, 2) for v in bbox)
+
+
+# --- Polygons ----------------------------------------------------------------
+
+class PolygonLOD:
+    """
+    BOM warning polygons with simplified copies per tolerance.
+    Geometries are built once per snapshot; each tolerance is simplified on
+    first use and kept, and per-view results are memoised by (bbox, band).
+    """
+
+    def __init__(self, polygons: List[Dict]):
+        self.records, geoms = [], []
+        for p in polygons or []:
+            rings = polygon_rings([p])
+            if not rings:
+                continue
+            self.records.append(p)
+            geoms.append(shapely.make_valid(shapely.polygons(rings[0])) if len(rings) == 1
+                         else shapely.make_valid(shapely.multipolygons([shapely.polygons(r) for r in rings])))
+        self.geoms = np.asarray(geoms, dtype=object)
+        self.bounds = shapely.bounds(self.geoms) if len(self.geoms) else np.empty((0, 4))
+        self._simplified: Dict[float, np.ndarray] = {}
+        self._views = LRUCache(maxsize=32)
+        self._lock = threading.Lock()
+
+    def _at(self, tol: Optional[float]) -> np.ndarray:
+        if tol is None:
+            return self.geoms
+        geoms = self._simplified.get(tol)
+        if geoms is None:
+            geoms = shapely.simplify(self.geoms, tol, preserve_topology=True)
+            self._simplified[tol] = geoms
+        return geoms
+
+    def view(self, bbox: BBox, zoom: float) -> List[Dict]:
+        """Polygon records clipped to bbox at the detail level for zoom."""
+        key = (_bbox_key(bbox), _band(zoom))
+        with self._lock:
+            hit = self._views.get(key)
+        metrics.cache_lookup("map_lod", hit is not None)
+        if hit is not None:
+            return hit
+
+        w, s, e, n = bbox
+        b = self.bounds
+        visible = np.nonzero((b[:, 2] >= w) & (b[:, 0] <= e) & (b[:, 3] >= s) & (b[:, 1] <= n))[0]
+        tol = tolerance_for_zoom(zoom)
+        decimals = decimals_for_tolerance(tol)
+        geoms = self._at(tol)[visible]
+        # only polygons reaching past the viewport need an actual clip
+        partial = ~((b[visible, 0] >= w) & (b[visible, 2] <= e) & (b[visible, 1] >= s) & (b[visible, 3] <= n))
+        if partial.any():
+            geoms = geoms.copy()
+            geoms[partial] = shapely.clip_by_rect(geoms[partial], w, s, e, n)
+
+        out = []
+        for i, g in zip(visible, geoms):
+            for part in getattr(g, "geoms", [g]):
+                if part.geom_type != "Polygon" or part.is_empty:
+                    continue
+                rec = {k: self.records[i].get(k) for k in _POLYGON_KEYS}
+                rec["polygon"] = np.round(np.asarray(part.exterior.coords), decimals).tolist()
+                out.append(rec)
+        with self._lock:
+            self._views[key] = out
+        return out
+
+
+# --- Points ------------------------------------------------------------------
+
+class PointLOD:
+    """
+    RFS incidents with bbox clipping and grid clustering at low zoom, served
+    from the snapshot's IncidentStore. Views are layer-ready frames (see
+    incident_store.FRAME_COLUMNS); clusters are rows with count > 1, so the
+    same layer styling and tooltip cover both. Views are cached per
+    (bbox, band); each call returns its own copy, so callers may modify it.
+    """
+
+    def __init__(self, store: IncidentStore):
+        self.store = store
+        self._views = LRUCache(maxsize=32)
+        self._lock = threading.Lock()
+
+    def view(self, bbox: BBox, zoom: float) -> pd.DataFrame:
+        key = (_bbox_key(bbox), _band(zoom))
+        with self._lock:
+            hit = self._views.get(key)
+        metrics.cache_lookup("map_lod", hit is not None)
+        if hit is not None:
+            return hit.copy()
+
+        st, (w, s, e, n) = self.store, bbox
+        idx = np.nonzero((st.lon >= w) & (st.lon <= e) & (st.lat >= s) & (st.lat <= n))[0]
+        if zoom >= CLUSTER_BELOW_ZOOM or len(idx) < 2:
+            out = st.to_frame(idx)
+        else:
+            out = self._cluster(idx, zoom)
+        out[["lat", "lon"]] = out[["lat", "lon"]].round(POINT_DECIMALS)
+        with self._lock:
+            self._views[key] = out
+        return out.copy()
+
+    def _cluster(self, idx: np.ndarray, zoom: float) -> pd.DataFrame:
+        st = self.store
+        cell = 360.0 / (2 ** zoom) / 8  # ~32 px cells
+        rows = np.floor(st.lat[idx] / cell).astype(np.int64)
+        cols = np.floor(st.lon[idx] / cell).astype(np.int64)
+        _, group = np.unique(np.stack([rows, cols], axis=1), axis=0, return_inverse=True)
+        group = group.reshape(-1)
+        n_groups = int(group.max()) + 1
+
+        count = np.bincount(group, minlength=n_groups)
+        lat = np.bincount(group, st.lat[idx], n_groups) / count
+        lon = np.bincount(group, st.lon[idx], n_groups) / count
+        # representative member: worst severity, earliest in the feed on ties
+        order = np.lexsort((idx, st.severity[idx], group))
+        rep = idx[order[np.unique(group[order], return_index=True)[1]]]
+        # most recently updated member per group (parsed times; unparseable sort first)
+        ts = np.nan_to_num(st.updated_ts[idx], nan=-np.inf)
+        order = np.lexsort((ts, group))
+        latest = idx[order[np.append(np.flatnonzero(np.diff(group[order])), len(order) - 1)]]
+
+        out = st.to_frame(rep)
+        multi = count > 1
+        out["count"] = count.astype(np.int32)
+        out.loc[multi, "lat"] = lat[multi]
+        out.loc[multi, "lon"] = lon[multi]
+        out.loc[multi, "title"] = [f"{c} incidents" for c in count[multi]]
+        out.loc[multi, "updated"] = st.updated.take(latest[multi])
+        # a cluster is coloured by its worst status alone (the title is synthetic)
+        colors = np.array([incident_color(s) for s in out.loc[multi, "status"]], dtype=np.uint8).reshape(-1, 3)
+        out.loc[multi, ["r", "g", "b"]] = colors
+        return out
+
+
+def points_in_view(records: List[Dict], bbox: BBox) -> List[Dict]:
+    """[{lat, lon}] for the records inside bbox (e.g. a diff's new/escalated incidents)."""
+    w, s, e, n = bbox
+    out = []
+    for r in records or []:
+        try:
+            lat, lon = float(r.get("lat")), float(r.get("lon"))
+        except (TypeError, ValueError):
+            continue
+        if w <= lon <= e and s <= lat <= n:
+            out.append({"lat": round(lat, POINT_DECIMALS), "lon": round(lon, POINT_DECIMALS)})
+    return out
+
+
+# --- Hotspots ----------------------------------------------------------------
+
+class HotspotLOD:
+    """FIRMS hotspots clipped to a view and binned at low zoom, memoised by (bbox, band)."""
+
+    def __init__(self, hotspots):
+        self.hotspots = hotspots
+        self._views = LRUCache(maxsize=32)
+        self._lock = threading.Lock()
+
+    def view(self, bbox: BBox, zoom: float) -> pd.DataFrame:
+        """Hotspots inside bbox; binned (summed FRP per cell) at low zoom. A copy per call."""
+        key = (_bbox_key(bbox), _band(zoom))
+        with self._lock:
+            hit = self._views.get(key)
+        metrics.cache_lookup("map_lod", hit is not None)
+        if hit is None:
+            hit = self._build(bbox, zoom)
+            with self._lock:
+                self._views[key] = hit
+        return hit.copy()
+
+    def _build(self, bbox: BBox, zoom: float) -> pd.DataFrame:
+        h, (w, s, e, n) = self.hotspots, bbox
+        m = (h.lon >= w) & (h.lon <= e) & (h.lat >= s) & (h.lat <= n)
+        lat, lon, frp = h.lat[m], h.lon[m], h.frp[m]
+        if zoom >= HEAT_BIN_BELOW_ZOOM or not len(lat):
+            return pd.DataFrame({"lat": lat, "lon": lon, "weight": frp.astype(float)}).round(
+                {"lat": HOTSPOT_DECIMALS, "lon": HOTSPOT_DECIMALS, "weight": 1})
+        cell = 360.0 / (2 ** zoom) / 32  # ~8 px bins, below the heatmap's blur radius
+        frame = pd.DataFrame({
+            "r": np.floor(lat / cell).astype(np.int64),
+            "c": np.floor(lon / cell).astype(np.int64),
+            "lat": lat, "lon": lon, "weight": frp.astype(float),
+        })
+        return (frame.groupby(["r", "c"], sort=False)
+                     .agg(lat=("lat", "mean"), lon=("lon", "mean"), weight=("weight", "sum"))
+                     .reset_index(drop=True)
+                     .round({"lat": HOTSPOT_DECIMALS, "lon": HOTSPOT_DECIMALS, "weight": 1}))
+
+
+# --- Per-snapshot entry points ------------------------------------------------
+
+def rfs_view(points: List[Dict], bbox: BBox, zoom: float) -> pd.DataFrame:
+    return memo_per_snapshot("lod:rfs", points, lambda p: PointLOD(get_incident_store(p))).view(bbox, zoom)
+
+
+def bom_view(polygons: List[Dict], bbox: BBox, zoom: float) -> List[Dict]:
+    return memo_per_snapshot("lod:bom", polygons, PolygonLOD).view(bbox, zoom)
+
+
+def hotspot_view(hotspots, bbox: BBox, zoom: float) -> pd.DataFrame:
+    return memo_per_snapshot("lod:firms", hotspots, HotspotLOD).view(bbox, zoom)
@@ -0,0 +1,203 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+# In-process metrics: counters, gauges and histograms keyed by name + labels,
+# rendered in the Prometheus text format (served at /metrics by the tile
+# server, or dumped to METRICS_FILE for node_exporter's textfile collector).
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (1e3, 1e4, 1e5, 3e5, 1e6, 3e6, 1e7, 3e7, 1e8)
+
+METRICS_FILE = os.getenv("METRICS_FILE", "").strip()
+METRICS_DUMP_EVERY_S = float(os.getenv("METRICS_DUMP_EVERY_S", "60"))
+
+_HELP = {
+    "http_request_seconds": ("histogram", "Upstream HTTP latency until headers/body, by source"),
+    "http_response_bytes": ("histogram", "Upstream response body size, by source"),
+    "http_responses_total": ("counter", "Upstream responses by source and status code"),
+    "http_errors_total": ("counter", "Upstream requests that raised (timeout, DNS, reset), by source"),
+    "feed_parse_seconds": ("histogram", "Time to parse a fetched feed payload, by source"),
+    "feed_errors_total": ("counter", "Feed refreshes that failed and kept the previous snapshot"),
+    "feed_last_refresh_timestamp_seconds": ("gauge", "Unix time of the last successful refresh, by source"),
+    "fetch_job_errors_total": ("counter", "fetch_all jobs that timed out or raised, by job and reason"),
+    "cache_requests_total": ("counter", "Cache lookups by cache and result (hit/miss)"),
+    "risk_seconds": ("histogram", "Risk scoring latency, by kind (query/points)"),
+    "risk_points_total": ("counter", "Points scored by compute_risk_for_points"),
+    "tile_request_seconds": ("histogram", "Vector tile build/serve time, by layer"),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics: le is inclusive)."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, Labels], float] = {}
+_gauges: Dict[Tuple[str, Labels], float] = {}
+_histograms: Dict[Tuple[str, Labels], Histogram] = {}
+_lru_watch: Dict[str, Callable] = {}  # cache name -> functools.lru_cache-wrapped function
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+# --- Recording -----------------------------------------------------------------
+
+def inc(metric: str, by: float = 1, **labels):
+    key = (metric, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + by
+
+
+def set_gauge(metric: str, value: float, **labels):
+    with _lock:
+        _gauges[(metric, _labels(labels))] = value
+
+
+def observe(metric: str, value: float, buckets=LATENCY_BUCKETS, **labels):
+    key = (metric, _labels(labels))
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = Histogram(buckets)
+        h.observe(value)
+
+
+@contextmanager
+def timer(metric: str, **labels):
+    """Observe the wall time of the with-block (also when it raises)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(metric, time.perf_counter() - t0, **labels)
+
+
+def timed(metric: str, **labels):
+    """Decorator form of timer()."""
+    def wrap(fn):
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            with timer(metric, **labels):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def cache_lookup(cache: str, hit: bool):
+    inc("cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+
+def watch_lru(cache: str, fn: Callable):
+    """Report fn.cache_info() (a functools.lru_cache) as cache_requests_total at render time."""
+    _lru_watch[cache] = fn
+    return fn
+
+
+# --- Reading -------------------------------------------------------------------
+
+def _collect_counters() -> Dict[Tuple[str, Labels], float]:
+    with _lock:
+        counters = dict(_counters)
+    for cache, fn in list(_lru_watch.items()):
+        info = fn.cache_info()
+        counters[("cache_requests_total", _labels({"cache": cache, "result": "hit"}))] = info.hits
+        counters[("cache_requests_total", _labels({"cache": cache, "result": "miss"}))] = info.misses
+    return counters
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+def render_prometheus() -> str:
+    """Every metric in the Prometheus text exposition format (version 0.0.4)."""
+    counters = _collect_counters()
+    with _lock:
+        gauges = dict(_gauges)
+        hists = {k: (h.buckets, list(h.counts), h.sum, h.count) for k, h in _histograms.items()}
+
+    by_name: Dict[str, List[str]] = {}
+    for (metric, labels), v in sorted(counters.items()):
+        by_name.setdefault(metric, []).append(f"{metric}{_fmt_labels(labels)} {_fmt_value(v)}")
+    for (metric, labels), v in sorted(gauges.items()):
+        by_name.setdefault(metric, []).append(f"{metric}{_fmt_labels(labels)} {_fmt_value(v)}")
+    for (metric, labels), (buckets, counts, total, n) in sorted(hists.items()):
+        lines = by_name.setdefault(metric, [])
+        seen = 0
+        for bound, c in zip(buckets + (float("inf"),), counts):
+            seen += c
+            lines.append(f"{metric}_bucket{_fmt_labels(labels, ('le', _fmt_value(bound)))} {seen}")
+        lines.append(f"{metric}_sum{_fmt_labels(labels)} {_fmt_value(total)}")
+        lines.append(f"{metric}_count{_fmt_labels(labels)} {n}")
+
+    out = []
+    for metric in sorted(by_name):
+        kind, help_text = _HELP.get(metric, ("untyped", metric))
+        out.append(f"# HELP {metric} {help_text}")
+        out.append(f"# TYPE {metric} {kind}")
+        out.extend(by_name[metric])
+    return "\n".join(out) + "\n"
+
+
+def dump_metrics(path: str):
+    """Write render_prometheus() to path atomically (rename over the old file)."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(render_prometheus())
+    os.replace(tmp, path)
+
+
+_dump_thread: Optional[threading.Thread] = None
+_dump_lock = threading.Lock()
+
+
+def start_metrics_dump() -> Optional[threading.Thread]:
+    """If METRICS_FILE is set, rewrite it every METRICS_DUMP_EVERY_S seconds (once per process)."""
+    global _dump_thread
+    if not METRICS_FILE:
+        return None
+    with _dump_lock:
+        if _dump_thread is None:
+            def loop():
+                while True:
+                    time.sleep(METRICS_DUMP_EVERY_S)
+                    try:
+                        dump_metrics(METRICS_FILE)
+                    except OSError as e:
+                        print("Metrics dump error:", e)
+            _dump_thread = threading.Thread(target=loop, name="metrics-dump", daemon=True)
+            _dump_thread.start()
+    return _dump_thread
@@ -0,0 +1,198 @@
+import math
+import struct
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Minimal Mapbox Vector Tile (v2) encoder: points and polygons with scalar
+# properties, which is all our layers need, without a protobuf dependency.
+# Wire format: https://github.com/mapbox/vector-tile-spec/tree/master/2.1
+
+EXTENT = 4096
+BUFFER = 64  # tile units kept outside the edge so features don't clip visibly
+
+_POINT, _POLYGON = 1, 3
+_MOVE_TO, _LINE_TO, _CLOSE_PATH = 1, 2, 7
+
+
+# --- Tile maths --------------------------------------------------------------
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(west, south, east, north) in degrees for an XYZ (slippy map) tile."""
+    n = 2 ** z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return (x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y))
+
+
+def buffered_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    w, s, e, n = tile_bounds(z, x, y)
+    fx, fy = (e - w) * BUFFER / EXTENT, (n - s) * BUFFER / EXTENT
+    return (w - fx, s - fy, e + fx, n + fy)
+
+
+def to_tile_coords(lons, lats, z: int, x: int, y: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Project lon/lat arrays to integer tile-local coordinates (y down)."""
+    n = 2 ** z
+    lons = np.asarray(lons, dtype=float)
+    lats = np.clip(np.asarray(lats, dtype=float), -85.0511, 85.0511)
+    gx = (lons + 180.0) / 360.0 * n
+    s = np.sin(np.radians(lats))
+    gy = (0.5 - np.log((1 + s) / (1 - s)) / (4 * math.pi)) * n
+    return (np.round((gx - x) * EXTENT).astype(np.int64),
+            np.round((gy - y) * EXTENT).astype(np.int64))
+
+
+# --- Protobuf primitives ------------------------------------------------------
+
+def _varint(v: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = v & 0x7F
+        v >>= 7
+        if v:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+def _zigzag(v: int) -> int:
+    return (v << 1) ^ (v >> 63)
+
+
+def _key(field: int, wire: int) -> bytes:
+    return _varint((field << 3) | wire)
+
+
+def _bytes_field(field: int, data: bytes) -> bytes:
+    return _key(field, 2) + _varint(len(data)) + data
+
+
+def _packed(field: int, values: Iterable[int]) -> bytes:
+    return _bytes_field(field, b"".join(_varint(v) for v in values))
+
+
+def _value(v) -> bytes:
+    if isinstance(v, bool):
+        return _key(7, 0) + _varint(int(v))
+    if isinstance(v, (int, np.integer)):
+        v = int(v)
+        return _key(6, 0) + _varint(_zigzag(v)) if v < 0 else _key(5, 0) + _varint(v)
+    if isinstance(v, (float, np.floating)):
+        return _key(3, 1) + struct.pack("<d", float(v))
+    return _bytes_field(1, str(v).encode("utf-8"))
+
+
+# --- Geometry commands --------------------------------------------------------
+
+def _command(cmd: int, count: int) -> int:
+    return (cmd & 0x7) | (count << 3)
+
+
+def _point_geometry(px: int, py: int) -> List[int]:
+    return [_command(_MOVE_TO, 1), _zigzag(px), _zigzag(py)]
+
+
+def _ring_geometry(xs: np.ndarray, ys: np.ndarray, cursor: List[int]) -> List[int]:
+    """Encode one closed ring (last point == first is dropped); cursor is updated in place."""
+    pts = np.stack([xs, ys], axis=1)
+    if len(pts) > 1 and (pts[0] == pts[-1]).all():
+        pts = pts[:-1]
+    if len(pts):
+        keep = np.ones(len(pts), dtype=bool)
+        keep[1:] = (np.diff(pts, axis=0) != 0).any(axis=1)  # drop repeats after quantising
+        pts = pts[keep]
+    if len(pts) < 3:
+        return []
+    deltas = np.diff(np.vstack([cursor, pts]), axis=0)
+    cursor[:] = pts[-1].tolist()
+    geom = [_command(_MOVE_TO, 1), _zigzag(int(deltas[0, 0])), _zigzag(int(deltas[0, 1])),
+            _command(_LINE_TO, len(deltas) - 1)]
+    for dx, dy in deltas[1:].tolist():
+        geom += (_zigzag(dx), _zigzag(dy))
+    geom.append(_command(_CLOSE_PATH, 1))
+    return geom
+
+
+def _signed_area(xs: np.ndarray, ys: np.ndarray) -> float:
+    return float(np.sum(xs[:-1] * ys[1:] - xs[1:] * ys[:-1]))
+
+
+# --- Layer builder ------------------------------------------------------------
+
+class LayerBuilder:
+    """Accumulates features for one named layer, interning property keys/values."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._keys: Dict[str, int] = {}
+        self._values: Dict[Tuple[type, object], int] = {}
+        self._features: List[bytes] = []
+
+    def __len__(self) -> int:
+        return len(self._features)
+
+    def _tags(self, props: Dict) -> List[int]:
+        tags = []
+        for k, v in props.items():
+            if v is None or v == "":
+                continue
+            if isinstance(v, np.generic):
+                v = v.item()
+            tags.append(self._keys.setdefault(k, len(self._keys)))
+            tags.append(self._values.setdefault((type(v), v), len(self._values)))
+        return tags
+
+    def _add(self, geom_type: int, geometry: List[int], props: Dict, fid: Optional[int]):
+        if not geometry:
+            return
+        msg = b""
+        if fid is not None:
+            msg += _key(1, 0) + _varint(int(fid))
+        tags = self._tags(props)
+        if tags:
+            msg += _packed(2, tags)
+        msg += _key(3, 0) + _varint(geom_type) + _packed(4, geometry)
+        self._features.append(msg)
+
+    def add_point(self, px: int, py: int, props: Dict, fid: Optional[int] = None):
+        self._add(_POINT, _point_geometry(px, py), props, fid)
+
+    def add_polygon(self, rings: Sequence[Tuple[np.ndarray, np.ndarray]], props: Dict,
+                    fid: Optional[int] = None):
+        """
+        rings: (xs, ys) tile-coordinate arrays, exterior first then holes.
+        Winding is fixed here: exterior positive area (clockwise on screen),
+        holes negative, as the spec requires.
+        """
+        cursor = [0, 0]
+        geometry: List[int] = []
+        for i, (xs, ys) in enumerate(rings):
+            area = _signed_area(xs, ys)
+            if area == 0:
+                if i == 0:
+                    return
+                continue
+            if (area > 0) != (i == 0):
+                xs, ys = xs[::-1], ys[::-1]
+            geometry += _ring_geometry(xs, ys, cursor)
+        self._add(_POLYGON, geometry, props, fid)
+
+    def encode(self) -> bytes:
+        msg = _key(15, 0) + _varint(2) + _bytes_field(1, self.name.encode("utf-8"))
+        for f in self._features:
+            msg += _bytes_field(2, f)
+        for k in self._keys:
+            msg += _bytes_field(3, k.encode("utf-8"))
+        for (_, v) in self._values:
+            msg += _bytes_field(4, _value(v))
+        msg += _key(5, 0) + _varint(EXTENT)
+        return msg
+
+
+def encode_tile(layers: Iterable[LayerBuilder]) -> bytes:
+    """Serialise layers into one tile; empty layers are omitted."""
+    return b"".join(_bytes_field(3, layer.encode()) for layer in layers if len(layer))
@@ -0,0 +1,76 @@
+import os
+import threading
+import time
+
+from src.afdrs import SOURCE as AFDRS_SOURCE, refresh_today_ratings
+from src.fetch_bom import SOURCE as BOM_SOURCE, refresh_bom_snapshot
+from src.fetch_firms import SOURCE as FIRMS_SOURCE, refresh_firms_points
+from src.fetch_rfs_nsw import SOURCE as RFS_SOURCE, refresh_rfs_points
+from src.snapshot_store import snapshot_age
+from src.utils_cache import single_flight
+
+# (source, refresh function, seconds between refreshes)
+# Each cadence sits well inside that fetcher's TTL, so page runs keep hitting
+# a warm cache and never wait on the network themselves.
+JOBS = [
+    (RFS_SOURCE, refresh_rfs_points, 600),        # TTL 15 min
+    (BOM_SOURCE, refresh_bom_snapshot, 420),      # TTL 10 min
+    (AFDRS_SOURCE, refresh_today_ratings, 2700),  # TTL 60 min
+    (FIRMS_SOURCE, refresh_firms_points, 1200),   # TTL 30 min
+]
+
+RETRY_AFTER_S = 60
+
+_threads = []
+_start_lock = threading.Lock()
+
+
+def start_prefetch():
+    """
+    Start one background refresher thread per source (once per process).
+    Safe to call on every script run; set PREFETCH_DISABLED=1 to opt out.
+    """
+    if os.getenv("PREFETCH_DISABLED", "").strip() in ("1", "true", "yes"):
+        return
+    with _start_lock:
+        if _threads:
+            return
+        for source, refresh, every in JOBS:
+            t = threading.Thread(
+                target=_loop, args=(source, refresh, every),
+                name=f"prefetch:{source}", daemon=True,
+            )
+            t.start()
+            _threads.append(t)
+
+
+def refresh_now(source: str, refresh) -> bool:
+    """
+    Run one refresh unless one for the same source is already in flight
+    (from another thread or a page's cold-cache fetch). Returns True if it ran.
+    """
+    lock = single_flight(source)
+    if not lock.acquire(blocking=False):
+        return False
+    try:
+        refresh()
+    except Exception as e:
+        print(f"Prefetch error ({source}):", e)
+    finally:
+        lock.release()
+    return True
+
+
+def _loop(source: str, refresh, every: float):
+    while True:
+        # A snapshot on disk younger than one cadence (saved before a restart,
+        # or by another worker process) is adopted instead of refetched.
+        refresh_now(source, lambda: refresh(reuse_within=every * 0.9))
+        age = snapshot_age(source)
+        if age is None:
+            wait = every
+        elif age < every:
+            wait = every - age
+        else:
+            wait = min(every, RETRY_AFTER_S)  # last refresh failed; retry sooner
+        time.sleep(max(1.0, wait))
@@ -0,0 +1,121 @@
+import threading
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+from src import metrics
+from src.archive import (hotspots_between, incident_events_between, incidents_at,
+                         warning_events_between, warnings_at)
+from src.incident_store import IncidentStore
+
+HOTSPOT_TRAIL_S = 12 * 3600  # hotspots stay on screen this long after the pass
+
+
+@dataclass(frozen=True)
+class ReplayFrame:
+    t: float
+    incidents: pd.DataFrame   # incident_store.FRAME_COLUMNS (lat, lon, ..., r, g, b)
+    warnings: List[Dict]      # get_bom_polygons()-shaped records
+    hotspots: pd.DataFrame    # lat, lon, weight
+
+
+@dataclass(frozen=True)
+class Replay:
+    t1: float
+    t2: float
+    step_s: float
+    frames: List[ReplayFrame]
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def index_at(self, t: float) -> int:
+        i = int((t - self.t1) // self.step_s)
+        return max(0, min(len(self.frames) - 1, i))
+
+
+def build_replay(t1: float, t2: float, step_s: float = 3600,
+                 hotspot_trail_s: float = HOTSPOT_TRAIL_S) -> Replay:
+    """
+    Precompute one frame per step from the archive.
+    The start state is read once, then events are applied in a single forward
+    pass; a frame whose layer didn't change reuses the previous frame's object,
+    so scrubbing through quiet hours costs nothing and memory tracks the
+    number of changes rather than frames x incidents.
+    """
+    times = np.arange(t1, t2 + step_s, step_s, dtype=float)
+    times[-1] = min(times[-1], t2)
+
+    incidents = {r["guid"]: r for r in incidents_at(t1)}
+    inc_events = incident_events_between(t1 + 1e-6, t2)
+    warnings = {w["key"]: w for w in warnings_at(t1)}
+    warn_events = warning_events_between(t1 + 1e-6, t2)
+
+    hot = hotspots_between(t1 - hotspot_trail_s, t2)
+    order = np.argsort(hot.acq_time, kind="stable")
+    hot_t, hot_lat, hot_lon, hot_frp = (hot.acq_time[order], hot.lat[order],
+                                        hot.lon[order], hot.frp[order])
+
+    frames: List[ReplayFrame] = []
+    ie = we = 0
+    inc_df = warn_list = hot_df = None
+    hot_span = None
+    for t in times:
+        changed = False
+        while ie < len(inc_events) and inc_events[ie]["t"] <= t:
+            e = inc_events[ie]
+            if e["kind"] == "closed":
+                incidents.pop(e["guid"], None)
+            else:
+                incidents[e["guid"]] = e
+            ie += 1
+            changed = True
+        if inc_df is None or changed:
+            inc_df = _incident_frame(incidents.values())
+
+        changed = False
+        while we < len(warn_events) and warn_events[we]["t"] <= t:
+            e = warn_events[we]
+            if e["kind"] == "expired":
+                warnings.pop(e["key"], None)
+            else:
+                warnings[e["key"]] = e
+            we += 1
+            changed = True
+        if warn_list is None or changed:
+            warn_list = [w for w in warnings.values() if w.get("polygon")]
+
+        lo = int(np.searchsorted(hot_t, t - hotspot_trail_s, side="right"))
+        hi = int(np.searchsorted(hot_t, t, side="right"))
+        if hot_df is None or (lo, hi) != hot_span:
+            hot_df = pd.DataFrame({"lat": hot_lat[lo:hi], "lon": hot_lon[lo:hi], "weight": hot_frp[lo:hi]})
+            hot_span = (lo, hi)
+
+        frames.append(ReplayFrame(float(t), inc_df, warn_list, hot_df))
+    return Replay(float(t1), float(t2), float(step_s), frames)
+
+
+def _incident_frame(records) -> pd.DataFrame:
+    return IncidentStore.from_records(list(records)).to_frame()
+
+
+_replays = LRUCache(maxsize=4)
+_replays_lock = threading.Lock()
+
+
+def get_replay(t1: float, t2: float, step_s: float = 3600) -> Replay:
+    """Cached build_replay; windows are snapped to whole steps so reruns hit the cache."""
+    t1 = np.floor(t1 / step_s) * step_s
+    t2 = np.ceil(t2 / step_s) * step_s
+    key = (t1, t2, step_s)
+    with _replays_lock:
+        hit = _replays.get(key)
+    metrics.cache_lookup("replay", hit is not None)
+    if hit is None:
+        hit = build_replay(t1, t2, step_s)
+        with _replays_lock:
+            _replays[key] = hit
+    return hit
@@ -1,14 +1,21 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from functools import lru_cache
-from math import radians, sin, cos, asin, sqrt
-from typing import List, Dict, Optional, Iterable
-import requests
+from typing import List, Dict, Optional, Sequence
 
+import numpy as np
+
+from src import http_client, metrics
+from src.concurrent_fetch import fetch_all
 from src.fetch_rfs_nsw import get_rfs_points
 from src.fetch_bom import get_bom_polygons
 from src.fetch_firms import get_firms_points
-from src.afdrs import get_today_rating_for_district  # optional weighting
+from src.afdrs import get_today_rating_for_district, get_today_ratings_for_districts  # optional weighting
+from src.gazetteer import load_gazetteer
+from src.location import detect_districts
+from src.snapshot_store import kv_get, kv_put
+from src.spatial_index import PointIndex, PolygonIndex
+from src.utils_cache import memo_per_snapshot
 
 @dataclass
 class RiskResult:
@@ -20,89 +27,71 @@ class RiskResult:
 # Utilities
 # -----------------------
 
-def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    R = 6371.0
-    dlat = radians(lat2 - lat1)
-    dlon = radians(lon2 - lon1)
-    a = sin(dlat/2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon/2)**2
-    c = 2 * asin(sqrt(a))
-    return R * c
+def _rfs_index() -> PointIndex:
+    """Spatial index over the current RFS snapshot (rebuilt only when it changes)."""
+    return memo_per_snapshot("risk:rfs_index", get_rfs_points() or [], PointIndex.from_records)
+
+def _firms_index() -> PointIndex:
+    """Spatial index over the current FIRMS snapshot (rebuilt only when it changes)."""
+    return memo_per_snapshot("risk:firms_index", get_firms_points(), lambda h: PointIndex(h.lat, h.lon))
 
 @lru_cache(maxsize=128)
 def _geocode_osm(query: str) -> Optional[Dict[str, float]]:
     if not (query or "").strip():
         return None
+    place = load_gazetteer().lookup(query)
+    if place:
+        return {"lat": place.lat, "lon": place.lon}
+    # persisted across restarts/workers; lru_cache stays as the in-process layer
+    key = query.strip().lower()
+    hit = kv_get("geocode_osm", key)
+    if hit:
+        return hit
     url = "https://nominatim.openstreetmap.org/search"
     params = {"q": query, "format": "json", "limit": 1, "countrycodes": "au"}
-    headers = {"User-Agent": "Outback_Early_Warning/1.0 (demo)"}
     try:
-        r = requests.get(url, params=params, headers=headers, timeout=10)
+        r = http_client.get(url, params=params, timeout=10, source="Nominatim geocode")
         r.raise_for_status()
         items = r.json()
         if not items:
             return None
         it = items[0]
-        return {"lat": float(it["lat"]), "lon": float(it["lon"])}
+        loc = {"lat": float(it["lat"]), "lon": float(it["lon"])}
+        kv_put("geocode_osm", key, loc)
+        return loc
     except Exception:
         return None
 
-def _point_in_polygon(lon: float, lat: float, ring: Iterable[Iterable[float]]) -> bool:
-    """
-    Ray-casting point-in-polygon. Expects coordinates as [lon, lat].
-    Returns True if (lon,lat) is inside the ring.
-    """
-    x, y = lon, lat
-    inside = False
-    pts = [tuple(p[:2]) for p in ring if isinstance(p, (list, tuple)) and len(p) >= 2]
-    if len(pts) < 3:
-        return False
-    j = len(pts) - 1
-    for i in range(len(pts)):
-        xi, yi = pts[i]
-        xj, yj = pts[j]
-        # edge intersects horizontal ray?
-        intersect = ((yi > y) != (yj > y)) and \
-                    (x < (xj - xi) * (y - yi) / (yj - yi + 1e-12) + xi)
-        if intersect:
-            inside = not inside
-        j = i
-    return inside
+metrics.watch_lru("geocode", _geocode_osm)
+
+def _bom_index(polygons: List[Dict]) -> PolygonIndex:
+    """Polygon index over the current BOM snapshot (rebuilt only when it changes)."""
+    return memo_per_snapshot("risk:bom_index", polygons, PolygonIndex.from_polygons)
 
 def _any_polygon_contains(lat: float, lon: float, polygons: List[Dict]) -> bool:
     """
     Accepts polygons from get_bom_polygons():
       - each item typically has 'polygon' key as a list of [lon, lat] points
-      - sometimes a MultiPolygon-like structure; we handle a list/list case
+      - sometimes a MultiPolygon-like structure; each ring is tested
     """
     if not polygons:
         return False
-    for poly in polygons:
-        coords = poly.get("polygon")
-        if not coords:
-            continue
-        # If coords is a list of rings, test each; else treat as a single ring
-        if isinstance(coords[0], list) and len(coords) >= 1 and isinstance(coords[0][0], (int, float, list)):
-            # either [[lon,lat], ...] or [[[lon,lat],...], [hole], ...]
-            if isinstance(coords[0][0], (int, float)):  # simple ring
-                if _point_in_polygon(lon, lat, coords):
-                    return True
-            else:  # list of rings
-                for ring in coords:
-                    if _point_in_polygon(lon, lat, ring):
-                        return True
-        else:
-            # Fallback: assume simple ring
-            try:
-                if _point_in_polygon(lon, lat, coords):
-                    return True
-            except Exception:
-                continue
-    return False
+    return _bom_index(polygons).contains(lat, lon)
 
 # -----------------------
 # Main scoring
 # -----------------------
 
+# overall budget for one location check (each upstream also has its own 10 s timeout)
+RISK_DEADLINE_S = 8.0
+
+_SOURCE_LABELS = {
+    "rfs": "NSW RFS incidents",
+    "bom": "BOM warnings",
+    "firms": "FIRMS hotspots",
+    "afdrs": "AFDRS rating",
+}
+
 _AFDRS_WEIGHT = {
     "No Rating": 1.00,
     "Moderate": 1.10,
@@ -112,6 +101,7 @@ _AFDRS_WEIGHT = {
     "Unknown": 1.00,
 }
 
+@metrics.timed("risk_seconds", kind="query")
 def compute_risk_for_query(q: str, district: Optional[str] = None) -> RiskResult:
     """
     Score is built from:
@@ -120,27 +110,86 @@ def compute_risk_for_query(q: str, district: Optional[str] = None) -> RiskResult
       - nearby FIRMS hotspot within 20 km (adds up to 0.15)
     Then multiplied by an AFDRS weighting if a district is provided.
     """
-    tags: List[str] = []
+    # Geocode and load every feed in parallel; bounded by the slowest source
+    # (or RISK_DEADLINE_S), not the sum of all of them.
+    has_district = bool((district or "").strip())
+    jobs = {
+        "geocode": lambda: _geocode_osm(q or ""),
+        "rfs": _rfs_index,
+        "bom": lambda: _bom_index(get_bom_polygons() or []),
+        "firms": _firms_index,
+    }
+    if has_district:
+        jobs["afdrs"] = lambda: get_today_rating_for_district(district).level
+    fetched = fetch_all(jobs, deadline=RISK_DEADLINE_S)
 
     # 1) Geocode
-    loc = _geocode_osm(q or "")
+    loc = fetched.results["geocode"]
     if not loc:
         return RiskResult(0.0, district, ["could not geocode location"])
     plat, plon = loc["lat"], loc["lon"]
 
     # 2) RFS proximity
-    rfs = get_rfs_points() or []
-    nearest_km = None
-    for p in rfs:
-        lat = p.get("lat")
-        lon = p.get("lon")
-        if lat is None or lon is None:
-            continue
-        try:
-            d = _haversine_km(plat, plon, float(lat), float(lon))
-        except Exception:
-            continue
-        nearest_km = d if nearest_km is None else min(nearest_km, d)
+    rfs = fetched.results["rfs"]
+    nearest = rfs.nearest(plat, plon) if rfs is not None else None
+    nearest_km = nearest[1] if nearest else None
+
+    # 3) BOM polygons (true point-in-polygon)
+    bom = fetched.results["bom"]
+    in_bom = bom.contains(plat, plon) if bom is not None else False
+
+    # 4) FIRMS hotspots (optional)
+    firms = fetched.results["firms"]
+    near_hotspot = firms.any_within(plat, plon, 20.0) if firms is not None else False
+
+    # 5) AFDRS weighting (if district provided)
+    lvl = (fetched.results["afdrs"] or "Unknown") if has_district else None
+
+    result = _score(nearest_km, in_bom, near_hotspot, district, lvl)
+    for name in fetched.degraded:
+        if name in _SOURCE_LABELS:
+            result.tags.append(f"{_SOURCE_LABELS[name]} unavailable right now ({fetched.status[name]})")
+    return result
+
+
+@metrics.timed("risk_seconds", kind="points")
+def compute_risk_for_points(lats: Sequence[float],
+                            lons: Sequence[float],
+                            districts: Optional[Sequence[Optional[str]]] = None) -> List[RiskResult]:
+    """
+    Batch version of compute_risk_for_query for already-geocoded points.
+    Distances, polygon containment and hotspot checks are vectorised over all
+    points; AFDRS ratings are looked up once per distinct district.
+    When districts is None they are resolved from the district boundaries.
+    Returns one RiskResult per input point, in input order.
+    """
+    plat = np.asarray(lats, dtype=float).reshape(-1)
+    plon = np.asarray(lons, dtype=float).reshape(-1)
+    if districts is None:
+        districts = detect_districts(plat, plon)
+    if not (len(plat) == len(plon) == len(districts)):
+        raise ValueError("lats, lons and districts must have the same length")
+
+    metrics.inc("risk_points_total", len(plat))
+    nearest_km = _rfs_index().nearest_km_many(plat, plon)
+    bom = get_bom_polygons() or []
+    in_bom = _bom_index(bom).contains_many(plat, plon)
+    near_hotspot = _firms_index().any_within_many(plat, plon, 20.0)
+
+    levels = {d: r.level for d, r in get_today_ratings_for_districts(
+        d for d in districts if (d or "").strip()).items()}
+
+    return [
+        _score(None if np.isinf(nearest_km[i]) else float(nearest_km[i]),
+               bool(in_bom[i]), bool(near_hotspot[i]), districts[i], levels.get(districts[i]))
+        for i in range(len(plat))
+    ]
+
+
+def _score(nearest_km: Optional[float], in_bom: bool, near_hotspot: bool,
+           district: Optional[str], afdrs_level: Optional[str]) -> RiskResult:
+    """Combine the individual signals into a RiskResult (shared by single and batch paths)."""
+    tags: List[str] = []
 
     base = 0.0
     if nearest_km is not None:
@@ -153,34 +202,18 @@ def compute_risk_for_query(q: str, district: Optional[str] = None) -> RiskResult
         elif nearest_km <= 30:
             tags.append("within 30 km of incident")
 
-    # 3) BOM polygons (true point-in-polygon)
-    bom = get_bom_polygons() or []
-    if _any_polygon_contains(plat, plon, bom):
+    if in_bom:
         base += 0.25
         tags.append("inside BOM warning area")
 
-    # 4) FIRMS hotspots (optional)
-    firms = get_firms_points() or []
-    for f in firms[:500]:
-        lat = f.get("lat")
-        lon = f.get("lon")
-        if lat is None or lon is None:
-            continue
-        try:
-            d = _haversine_km(plat, plon, float(lat), float(lon))
-        except Exception:
-            continue
-        if d <= 20:
-            base = base + 0.15
-            tags.append("near recent heat hotspot (≤20 km)")
-            break
+    if near_hotspot:
+        base = base + 0.15
+        tags.append("near recent heat hotspot (≤20 km)")
 
-    # 5) AFDRS weighting (if district provided)
     weight = 1.0
-    if (district or "").strip():
-        lvl = get_today_rating_for_district(district).level
-        weight = _AFDRS_WEIGHT.get(lvl, 1.0)
-        tags.append(f"AFDRS today in {district}: {lvl}")
+    if afdrs_level is not None:
+        weight = _AFDRS_WEIGHT.get(afdrs_level, 1.0)
+        tags.append(f"AFDRS today in {district}: {afdrs_level}")
 
     score = max(0.0, min(1.0, base * weight))
 
@@ -1,7 +1,20 @@
 import streamlit as st
 from datetime import datetime
 
+from src.alerts import start_alerts
+from src.archive import start_archive
+from src.metrics import start_metrics_dump
+from src.prefetch import start_prefetch
+from src.tile_server import start_tile_server
+
 def render_sidebar():
+    # every page calls this first, so it doubles as the app-wide startup hook
+    start_alerts()  # listeners first, so the first prefetch refresh is seen
+    start_archive()
+    start_prefetch()
+    start_tile_server()
+    start_metrics_dump()
+
     st.sidebar.header("Navigation")
     st.sidebar.page_link("Home.py", label="🏠 Home")
     st.sidebar.page_link("pages/1_My_Location.py", label="📍 My Location")
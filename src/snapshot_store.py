@@ -0,0 +1,107 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+# One SQLite file shared by every worker process on the host. WAL mode lets
+# readers and the single writer proceed concurrently.
+DB_PATH = Path(os.getenv("SNAPSHOT_DB", "data/snapshots.sqlite3"))
+
+_local = threading.local()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    source     TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,      -- unix epoch seconds
+    payload    TEXT NOT NULL       -- JSON
+);
+CREATE TABLE IF NOT EXISTS kv (
+    namespace  TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    stored_at  REAL NOT NULL,
+    value      TEXT NOT NULL,      -- JSON
+    PRIMARY KEY (namespace, key)
+);
+"""
+
+
+def _conn() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+# --- Feed snapshots ----------------------------------------------------------
+
+def save_snapshot(source: str, payload: Any, fetched_at: Optional[float] = None) -> None:
+    """Persist the latest parsed payload for a source (replaces the previous one)."""
+    try:
+        _conn().execute(
+            "INSERT OR REPLACE INTO snapshots (source, fetched_at, payload) VALUES (?, ?, ?)",
+            (source, fetched_at or time.time(), json.dumps(payload, separators=(",", ":"))),
+        )
+    except (sqlite3.Error, TypeError, ValueError) as e:
+        print(f"Snapshot save error ({source}):", e)
+
+
+def load_snapshot(source: str, max_age_s: Optional[float] = None) -> Optional[Tuple[Any, float]]:
+    """
+    Return (payload, fetched_at) for a source, or None if there is no snapshot
+    or it is older than max_age_s seconds.
+    """
+    try:
+        row = _conn().execute(
+            "SELECT payload, fetched_at FROM snapshots WHERE source = ?", (source,)
+        ).fetchone()
+    except sqlite3.Error as e:
+        print(f"Snapshot load error ({source}):", e)
+        return None
+    if row is None:
+        return None
+    payload, fetched_at = row
+    if max_age_s is not None and time.time() - fetched_at > max_age_s:
+        return None
+    return json.loads(payload), fetched_at
+
+
+def snapshot_age(source: str) -> Optional[float]:
+    """Seconds since the stored snapshot for source was fetched (None if absent)."""
+    try:
+        row = _conn().execute(
+            "SELECT fetched_at FROM snapshots WHERE source = ?", (source,)
+        ).fetchone()
+    except sqlite3.Error:
+        return None
+    return None if row is None else max(0.0, time.time() - row[0])
+
+
+# --- Small keyed lookups (e.g. geocoder results) -----------------------------
+
+def kv_get(namespace: str, key: str, max_age_s: Optional[float] = None) -> Optional[Any]:
+    try:
+        row = _conn().execute(
+            "SELECT value, stored_at FROM kv WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+    except sqlite3.Error:
+        return None
+    if row is None or (max_age_s is not None and time.time() - row[1] > max_age_s):
+        return None
+    return json.loads(row[0])
+
+
+def kv_put(namespace: str, key: str, value: Any) -> None:
+    try:
+        _conn().execute(
+            "INSERT OR REPLACE INTO kv (namespace, key, stored_at, value) VALUES (?, ?, ?, ?)",
+            (namespace, key, time.time(), json.dumps(value)),
+        )
+    except (sqlite3.Error, TypeError, ValueError) as e:
+        print(f"Snapshot kv error ({namespace}):", e)
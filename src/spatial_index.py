@@ -0,0 +1,324 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import shapely
+from shapely import STRtree
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEG = 111.195  # great-circle km per degree of latitude
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; arguments broadcast like NumPy arrays."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class PointIndex:
+    """
+    Grid-bucketed index over lat/lon points for radius and nearest queries.
+
+    Points are sorted into cell_deg x cell_deg cells once; a query only gathers
+    the cells overlapping its search window and then refines with an exact
+    haversine, so results match a full linear scan. No antimeridian handling
+    (not needed for Australian feeds).
+    """
+
+    def __init__(self, lats: Iterable[float], lons: Iterable[float],
+                 ids: Optional[Iterable[int]] = None, cell_deg: float = 0.25):
+        self.lats = np.asarray(lats, dtype=float).reshape(-1)
+        self.lons = np.asarray(lons, dtype=float).reshape(-1)
+        self.ids = (np.arange(len(self.lats)) if ids is None
+                    else np.asarray(ids, dtype=np.int64).reshape(-1))
+        self.cell_deg = float(cell_deg)
+
+        rows = np.floor(self.lats / self.cell_deg).astype(np.int64)
+        cols = np.floor(self.lons / self.cell_deg).astype(np.int64)
+        self._order = np.lexsort((cols, rows))
+        cells, starts = np.unique(
+            np.stack([rows[self._order], cols[self._order]], axis=1),
+            axis=0, return_index=True,
+        ) if len(self.lats) else (np.empty((0, 2), np.int64), np.empty(0, np.int64))
+        self._cell_rows = cells[:, 0]
+        self._cell_cols = cells[:, 1]
+        self._starts = starts
+        self._ends = np.append(starts[1:], len(self.lats)).astype(np.int64)
+
+    @classmethod
+    def from_records(cls, records: List[Dict], cell_deg: float = 0.25) -> "PointIndex":
+        """Index dict records with lat/lon keys; ids map back to record positions."""
+        lats, lons, ids = [], [], []
+        for i, r in enumerate(records or []):
+            try:
+                lat, lon = float(r.get("lat")), float(r.get("lon"))
+            except (TypeError, ValueError):
+                continue
+            lats.append(lat)
+            lons.append(lon)
+            ids.append(i)
+        return cls(lats, lons, ids, cell_deg=cell_deg)
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Positions (into self.lats) of every point in cells touching the search window."""
+        dlat = radius_km / KM_PER_DEG
+        coslat = np.cos(np.radians(min(89.9, abs(lat) + dlat)))
+        dlon = min(360.0, radius_km / (KM_PER_DEG * max(coslat, 1e-6)))
+
+        r0, r1 = np.floor((lat - dlat) / self.cell_deg), np.floor((lat + dlat) / self.cell_deg)
+        c0, c1 = np.floor((lon - dlon) / self.cell_deg), np.floor((lon + dlon) / self.cell_deg)
+        hit = np.nonzero(
+            (self._cell_rows >= r0) & (self._cell_rows <= r1)
+            & (self._cell_cols >= c0) & (self._cell_cols <= c1)
+        )[0]
+        if not len(hit):
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self._order[self._starts[h]:self._ends[h]] for h in hit])
+
+    def within(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """(ids, distances_km) of all points within radius_km, unsorted."""
+        pos = self._candidates(lat, lon, radius_km)
+        d = haversine_km(lat, lon, self.lats[pos], self.lons[pos])
+        keep = d <= radius_km
+        return self.ids[pos[keep]], d[keep]
+
+    def any_within(self, lat: float, lon: float, radius_km: float) -> bool:
+        return len(self.within(lat, lon, radius_km)[0]) > 0
+
+    def nearest(self, lat: float, lon: float) -> Optional[Tuple[int, float]]:
+        """(id, distance_km) of the closest point, or None for an empty index."""
+        if not len(self):
+            return None
+        radius = self.cell_deg * KM_PER_DEG
+        while radius < np.pi * EARTH_RADIUS_KM:
+            pos = self._candidates(lat, lon, radius)
+            if len(pos):
+                d = haversine_km(lat, lon, self.lats[pos], self.lons[pos])
+                best = int(np.argmin(d))
+                # every point within `radius` was a candidate, so this is exact
+                if d[best] <= radius:
+                    return int(self.ids[pos[best]]), float(d[best])
+            radius *= 2
+        d = haversine_km(lat, lon, self.lats, self.lons)
+        best = int(np.argmin(d))
+        return int(self.ids[best]), float(d[best])
+
+    # --- Batch queries (vectorised over many query points) -----------------
+    #
+    # Queries are grouped by the grid cell they fall in; each group is refined
+    # against the index cells in a block of rings around its cell, so the work
+    # per group scales with the local point density rather than len(self).
+
+    def _group_queries(self, qlat: np.ndarray, qlon: np.ndarray):
+        """Yield (row, col, query positions) for each grid cell holding queries."""
+        rows = np.floor(qlat / self.cell_deg).astype(np.int64)
+        cols = np.floor(qlon / self.cell_deg).astype(np.int64)
+        cells, inverse = np.unique(np.stack([rows, cols], axis=1), axis=0, return_inverse=True)
+        order = np.argsort(inverse.reshape(-1), kind="stable")
+        bounds = np.searchsorted(inverse.reshape(-1)[order], np.arange(len(cells) + 1))
+        for g, (row, col) in enumerate(cells):
+            yield int(row), int(col), order[bounds[g]:bounds[g + 1]]
+
+    def _ring_cells(self, row: int, col: int) -> np.ndarray:
+        """Chebyshev ring distance (in cells) from (row, col) to every occupied index cell."""
+        return np.maximum(np.abs(self._cell_rows - row), np.abs(self._cell_cols - col))
+
+    def _cell_points(self, hit: np.ndarray) -> np.ndarray:
+        if not len(hit):
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self._order[self._starts[h]:self._ends[h]] for h in hit])
+
+    def _ring_safe_km(self, row: int, k: int) -> float:
+        """Any point within this many km of a query in cell row lies inside its k-ring block."""
+        maxlat = max(abs(row * self.cell_deg), abs((row + 1) * self.cell_deg)) + k * self.cell_deg
+        return k * self.cell_deg * KM_PER_DEG * np.cos(np.radians(min(89.9, maxlat)))
+
+    def nearest_km_many(self, lats, lons) -> np.ndarray:
+        """Distance in km from each query point to its nearest point (inf if empty)."""
+        qlat = np.asarray(lats, dtype=float).reshape(-1)
+        qlon = np.asarray(lons, dtype=float).reshape(-1)
+        out = np.full(len(qlat), np.inf)
+        if not len(self) or not len(qlat):
+            return out
+        for row, col, q in self._group_queries(qlat, qlon):
+            ring = self._ring_cells(row, col)
+            k = max(1, int(ring.min()))
+            while len(q):
+                pos = self._cell_points(np.nonzero(ring <= k)[0])
+                complete = len(pos) == len(self)
+                if len(pos):
+                    d = haversine_km(qlat[q, None], qlon[q, None],
+                                     self.lats[None, pos], self.lons[None, pos]).min(axis=1)
+                    # exact once the nearest candidate is closer than anything outside the block
+                    done = np.ones(len(q), dtype=bool) if complete else d <= self._ring_safe_km(row, k)
+                    out[q[done]] = d[done]
+                    q = q[~done]
+                k *= 2
+        return out
+
+    def any_within_many(self, lats, lons, radius_km: float) -> np.ndarray:
+        """Boolean mask: does each query point have any indexed point within radius_km?"""
+        qlat = np.asarray(lats, dtype=float).reshape(-1)
+        qlon = np.asarray(lons, dtype=float).reshape(-1)
+        out = np.zeros(len(qlat), dtype=bool)
+        if not len(self) or not len(qlat):
+            return out
+        for row, col, q in self._group_queries(qlat, qlon):
+            ring = self._ring_cells(row, col)
+            # smallest block guaranteed to hold every point within radius_km of this cell
+            reach, last = 1, int(ring.max())
+            while reach < last and self._ring_safe_km(row, reach) < radius_km:
+                reach *= 2
+            # nearest rings first; queries drop out on their first hit
+            for k in np.unique(ring[ring <= reach]):
+                pos = self._cell_points(np.nonzero(ring == k)[0])
+                d = haversine_km(qlat[q, None], qlon[q, None], self.lats[None, pos], self.lons[None, pos])
+                hit = (d <= radius_km).any(axis=1)
+                out[q[hit]] = True
+                q = q[~hit]
+                if not len(q):
+                    break
+        return out
+
+
+def polygon_rings(polygons: List[Dict]) -> List[np.ndarray]:
+    """Flatten get_bom_polygons() output into (n, 2) [lon, lat] ring arrays."""
+    rings = []
+    for poly in polygons or []:
+        coords = poly.get("polygon")
+        if not coords:
+            continue
+        if isinstance(coords[0], list) and coords[0] and isinstance(coords[0][0], list):
+            candidates = coords  # list of rings
+        else:
+            candidates = [coords]  # simple ring
+        for ring in candidates:
+            pts = [p[:2] for p in ring if isinstance(p, (list, tuple)) and len(p) >= 2]
+            if len(pts) >= 3:
+                rings.append(np.asarray(pts, dtype=float))
+    return rings
+
+
+class PolygonIndex:
+    """
+    STRtree over warning-area polygons for point containment.
+    The tree does the bounding-box prefilter; only the few polygons whose
+    boxes contain the point get an exact test against prepared geometries.
+    Each ring is treated as its own area, as the BOM layer draws them.
+    """
+
+    def __init__(self, rings: List[np.ndarray]):
+        geoms = []
+        for ring in rings:
+            g = shapely.Polygon(ring)
+            geoms.append(g if g.is_valid else shapely.make_valid(g))
+        self.geoms = np.asarray(geoms, dtype=object)
+        self.owners = np.arange(len(geoms))  # ring -> source polygon position
+        shapely.prepare(self.geoms)
+        self.tree = STRtree(self.geoms)
+
+    @classmethod
+    def from_polygons(cls, polygons: List[Dict]) -> "PolygonIndex":
+        rings, owners = [], []
+        for i, poly in enumerate(polygons or []):
+            r = polygon_rings([poly])
+            rings += r
+            owners += [i] * len(r)
+        index = cls(rings)
+        index.owners = np.asarray(owners, dtype=np.int64)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.geoms)
+
+    def contains(self, lat: float, lon: float) -> bool:
+        if not len(self):
+            return False
+        return len(self.tree.query(shapely.Point(lon, lat), predicate="within")) > 0
+
+    def contains_many(self, lats, lons) -> np.ndarray:
+        """Boolean mask: is each point inside any polygon?"""
+        lats = np.asarray(lats, dtype=float).reshape(-1)
+        lons = np.asarray(lons, dtype=float).reshape(-1)
+        out = np.zeros(len(lats), dtype=bool)
+        if not len(self) or not len(lats):
+            return out
+        point_idx, _ = self.tree.query(shapely.points(lons, lats), predicate="within")
+        out[point_idx] = True
+        return out
+
+    def pairs_many(self, lats, lons) -> Tuple[np.ndarray, np.ndarray]:
+        """(point positions, source polygon positions) for every containment hit."""
+        lats = np.asarray(lats, dtype=float).reshape(-1)
+        lons = np.asarray(lons, dtype=float).reshape(-1)
+        if not len(self) or not len(lats):
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        point_idx, ring_idx = self.tree.query(shapely.points(lons, lats), predicate="within")
+        return point_idx, self.owners[ring_idx]
+
+
+# --- Geohash -------------------------------------------------------------------
+
+_GEOHASH_BASE32 = np.frombuffer(b"0123456789bcdefghjkmnpqrstuvwxyz", dtype=np.uint8)
+
+
+def _geohash_bits(precision: int) -> Tuple[int, int]:
+    """(lon bits, lat bits) for a geohash of `precision` characters."""
+    total = 5 * precision
+    return (total + 1) // 2, total // 2
+
+
+def geohash_cell_deg(precision: int) -> Tuple[float, float]:
+    """(width, height) in degrees of one geohash cell."""
+    lon_bits, lat_bits = _geohash_bits(precision)
+    return 360.0 / 2 ** lon_bits, 180.0 / 2 ** lat_bits
+
+
+def geohash_many(lats, lons, precision: int = 9) -> List[str]:
+    """Vectorised geohash encoding (precision <= 12)."""
+    lats = np.asarray(lats, dtype=float).reshape(-1)
+    lons = np.asarray(lons, dtype=float).reshape(-1)
+    lon_bits, lat_bits = _geohash_bits(precision)
+    xi = np.clip(((lons + 180.0) / 360.0 * 2 ** lon_bits).astype(np.uint64), 0, 2 ** lon_bits - 1)
+    yi = np.clip(((lats + 90.0) / 180.0 * 2 ** lat_bits).astype(np.uint64), 0, 2 ** lat_bits - 1)
+    # interleave, longitude first (most significant)
+    code = np.zeros(len(lats), dtype=np.uint64)
+    for b in range(5 * precision):
+        if b % 2 == 0:
+            bit = (xi >> np.uint64(lon_bits - 1 - b // 2)) & np.uint64(1)
+        else:
+            bit = (yi >> np.uint64(lat_bits - 1 - b // 2)) & np.uint64(1)
+        code = (code << np.uint64(1)) | bit
+    chars = np.empty((len(lats), precision), dtype=np.uint8)
+    for c in range(precision):
+        shift = np.uint64(5 * (precision - 1 - c))
+        chars[:, c] = _GEOHASH_BASE32[((code >> shift) & np.uint64(31)).astype(np.intp)]
+    return [row.tobytes().decode("ascii") for row in chars]
+
+
+def geohash(lat: float, lon: float, precision: int = 9) -> str:
+    return geohash_many([lat], [lon], precision)[0]
+
+
+def geohash_cover(lat: float, lon: float, radius_km: float, max_cells: int = 16) -> List[str]:
+    """
+    Geohash prefixes whose cells together cover the radius_km circle around
+    (lat, lon), using the finest precision that needs at most max_cells.
+    Stored geohashes starting with any of them are the candidates to refine.
+    """
+    dlat = radius_km / KM_PER_DEG
+    dlon = radius_km / (KM_PER_DEG * max(np.cos(np.radians(min(89.9, abs(lat) + dlat))), 1e-6))
+    s, n, w, e = lat - dlat, lat + dlat, lon - dlon, lon + dlon
+    for precision in range(9, 0, -1):
+        cw, ch = geohash_cell_deg(precision)
+        nx = int(np.floor((e + 180) / cw) - np.floor((w + 180) / cw)) + 1
+        ny = int(np.floor((n + 90) / ch) - np.floor((s + 90) / ch)) + 1
+        if nx * ny <= max_cells or precision == 1:
+            break
+    xs = np.minimum(w + np.arange(nx) * cw, e)
+    ys = np.minimum(s + np.arange(ny) * ch, n)
+    gx, gy = np.meshgrid(np.append(xs, e), np.append(ys, n))
+    return sorted(set(geohash_many(gy.ravel(), gx.ravel(), precision)))
@@ -0,0 +1,233 @@
+import gzip
+import os
+import re
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import shapely
+from cachetools import LRUCache
+from shapely import STRtree
+
+from src import metrics
+from src.fetch_bom import get_bom_polygons
+from src.fetch_firms import get_firms_points
+from src.fetch_rfs_nsw import get_rfs_points
+from src.incident_store import get_incident_store
+from src.mvt import LayerBuilder, buffered_bounds, encode_tile, to_tile_coords
+from src.spatial_index import polygon_rings
+from src.utils_cache import memo_per_snapshot
+
+TILE_HOST = os.getenv("TILE_HOST", "127.0.0.1")
+TILE_PORT = int(os.getenv("TILE_PORT", "8765"))
+# base URL the browser uses to reach this server (differs behind a proxy)
+TILE_PUBLIC_URL = os.getenv("TILE_PUBLIC_URL", f"http://localhost:{TILE_PORT}").rstrip("/")
+MAX_ZOOM = 16
+
+_ROUTE = re.compile(r"^/tiles/(rfs|bom|firms)/(\d+)/(\d+)/(\d+)\.(?:mvt|pbf)$")
+
+
+def tile_url_template(layer: str) -> str:
+    return f"{TILE_PUBLIC_URL}/tiles/{layer}/{{z}}/{{x}}/{{y}}.mvt"
+
+
+# --- Per-snapshot tile sets ---------------------------------------------------
+
+class _TileSet(ABC):
+    """
+    Encoded tiles for one snapshot of one layer.
+    A new snapshot object means a new _TileSet (via memo_per_snapshot), so the
+    tile cache and ETag version are dropped together with the data.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.version = uuid.uuid4().hex[:12]
+        self._tiles = LRUCache(maxsize=512)
+        self._lock = threading.Lock()
+
+    def tile(self, z: int, x: int, y: int, gz: bool = False) -> bytes:
+        key = (z, x, y, gz)
+        with self._lock:
+            hit = self._tiles.get(key)
+        metrics.cache_lookup("tiles", hit is not None)
+        if hit is None:
+            if gz:
+                raw = self.tile(z, x, y)
+                hit = gzip.compress(raw, compresslevel=6) if raw else raw
+            else:
+                layer = LayerBuilder(self.name)
+                self._fill(layer, z, x, y)
+                hit = encode_tile([layer])
+            with self._lock:
+                self._tiles[key] = hit
+        return hit
+
+    @abstractmethod
+    def _fill(self, layer: LayerBuilder, z: int, x: int, y: int):
+        """Add this snapshot's features for tile z/x/y to layer."""
+
+
+class _PointTiles(_TileSet):
+    def __init__(self, name: str, lats, lons, props: List[Dict]):
+        super().__init__(name)
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self.props = props
+
+    def _fill(self, layer, z, x, y):
+        w, s, e, n = buffered_bounds(z, x, y)
+        idx = np.nonzero((self.lons >= w) & (self.lons <= e) & (self.lats >= s) & (self.lats <= n))[0]
+        px, py = to_tile_coords(self.lons[idx], self.lats[idx], z, x, y)
+        for i, tx, ty in zip(idx.tolist(), px.tolist(), py.tolist()):
+            layer.add_point(tx, ty, self.props[i], fid=i)
+
+
+class _PolygonTiles(_TileSet):
+    def __init__(self, name: str, polygons: List[Dict]):
+        super().__init__(name)
+        self.props, geoms = [], []
+        for p in polygons or []:
+            for ring in polygon_rings([p]):  # each ring is its own area, as on the map
+                geoms.append(shapely.make_valid(shapely.polygons(ring)))
+                self.props.append({
+                    "title": p.get("title"), "headline": p.get("headline"),
+                    "effective": p.get("effective"),
+                })
+        self.geoms = np.asarray(geoms, dtype=object)
+        self.tree = STRtree(self.geoms)
+
+    def _fill(self, layer, z, x, y):
+        w, s, e, n = buffered_bounds(z, x, y)
+        hits = self.tree.query(shapely.box(w, s, e, n))
+        # drop detail below a tile unit before clipping; keeps low-zoom tiles small
+        tol = (e - w) / 4096
+        for i in np.sort(hits).tolist():
+            g = shapely.clip_by_rect(shapely.simplify(self.geoms[i], tol), w, s, e, n)
+            for part in getattr(g, "geoms", [g]):
+                if part.geom_type != "Polygon" or part.is_empty:
+                    continue
+                rings = []
+                for r in [part.exterior, *part.interiors]:
+                    c = np.asarray(r.coords)
+                    rings.append(to_tile_coords(c[:, 0], c[:, 1], z, x, y))
+                layer.add_polygon(rings, self.props[i], fid=i)
+
+
+def _rfs_tiles(points) -> _PointTiles:
+    # same rows and precomputed status colours as the ScatterplotLayer path
+    store = get_incident_store(points)
+    cols = {k: getattr(store, k) for k in ("guid", "title", "status", "category", "updated", "url")}
+    props = [{**{k: c[i] for k, c in cols.items()}, "r": r, "g": g, "b": b}
+             for i, (r, g, b) in enumerate(store.color.tolist())]
+    return _PointTiles("rfs", store.lat, store.lon, props)
+
+
+def _firms_tiles(hotspots) -> _PointTiles:
+    props = [{"frp": round(f, 1), "confidence": c, "acq_time": t}
+             for f, c, t in zip(hotspots.frp.tolist(), hotspots.confidence.tolist(),
+                                hotspots.acq_time.tolist())]
+    return _PointTiles("firms", hotspots.lat, hotspots.lon, props)
+
+
+def _tileset(layer: str) -> _TileSet:
+    if layer == "rfs":
+        return memo_per_snapshot("tiles:rfs", get_rfs_points() or [], _rfs_tiles)
+    if layer == "bom":
+        return memo_per_snapshot("tiles:bom", get_bom_polygons() or [],
+                                 lambda polys: _PolygonTiles("bom", polys))
+    return memo_per_snapshot("tiles:firms", get_firms_points(), _firms_tiles)
+
+
+def get_tile(layer: str, z: int, x: int, y: int, gz: bool = False) -> Tuple[bytes, str]:
+    """
+    (encoded MVT bytes, ETag) for one tile of the current snapshot; gz=True gzips it.
+    Each encoding gets its own ETag so a 304 never revalidates the other variant.
+    """
+    ts = _tileset(layer)
+    body = ts.tile(z, x, y, gz)
+    suffix = "-gz" if gz and body else ""
+    return body, f'"{ts.version}-{z}-{x}-{y}{suffix}"'
+
+
+# --- HTTP ----------------------------------------------------------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            self._send_metrics()
+            return
+        m = _ROUTE.match(path)
+        if not m:
+            self.send_error(404)
+            return
+        layer, z, x, y = m.group(1), *(int(v) for v in m.groups()[1:])
+        if z > MAX_ZOOM or x >= 2 ** z or y >= 2 ** z:
+            self.send_error(404)
+            return
+        gz = "gzip" in (self.headers.get("Accept-Encoding") or "")
+        try:
+            with metrics.timer("tile_request_seconds", layer=layer):
+                body, etag = get_tile(layer, z, x, y, gz)
+        except Exception as e:
+            print("Tile error:", e)
+            self.send_error(500)
+            return
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self._common_headers(etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        if gz and body:
+            self.send_header("Content-Encoding", "gzip")
+        self._common_headers(etag)
+        self.send_header("Content-Type", "application/vnd.mapbox-vector-tile")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_metrics(self):
+        body = metrics.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _common_headers(self, etag: str):
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "public, max-age=60")
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Access-Control-Allow-Origin", "*")
+
+    def log_message(self, fmt, *args):
+        pass  # one line per tile would drown the Streamlit log
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_tried = False
+_server_lock = threading.Lock()
+
+
+def start_tile_server() -> Optional[ThreadingHTTPServer]:
+    """Serve /tiles/{rfs,bom,firms}/{z}/{x}/{y}.mvt and /metrics from a daemon thread (idempotent)."""
+    global _server, _server_tried
+    if os.getenv("TILE_SERVER_DISABLED"):
+        return None
+    with _server_lock:
+        if not _server_tried:
+            _server_tried = True
+            try:
+                _server = ThreadingHTTPServer((TILE_HOST, TILE_PORT), _Handler)
+            except OSError as e:  # port taken, e.g. by another worker process
+                print("Tile server not started:", e)
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="tile-server", daemon=True).start()
+    return _server
@@ -1,10 +1,54 @@
 import streamlit as st
 import datetime
+import threading
+import time
+
+from src import metrics
 
 _last_update = {}  # name -> datetime.utcnow()
+_derived = {}      # key -> (snapshot object, value built from it)
+_flights = {}      # source name -> refresh lock
+_listeners = {}    # source name -> [callback(payload)]
+_flights_guard = threading.Lock()
+
+def update_cache_time(name: str, fetched_at: float | None = None):
+    """Record a refresh; fetched_at (unix epoch) is used for snapshots loaded from disk."""
+    if fetched_at is None:
+        _last_update[name] = datetime.datetime.utcnow()
+    else:
+        _last_update[name] = datetime.datetime.utcfromtimestamp(fetched_at)
+    metrics.set_gauge("feed_last_refresh_timestamp_seconds",
+                      time.time() if fetched_at is None else fetched_at, source=name)
+
+def on_refresh(name: str, callback):
+    """Register callback(payload) to run after each refresh of source `name`."""
+    _listeners.setdefault(name, []).append(callback)
+
+def notify_refresh(name: str, payload):
+    """Hand a fresh payload (e.g. a diff) to every listener; one failing listener doesn't stop the rest."""
+    for callback in list(_listeners.get(name, [])):
+        try:
+            callback(payload)
+        except Exception as e:
+            print(f"Refresh listener error ({name}):", e)
+
+def single_flight(name: str) -> threading.Lock:
+    """Per-source lock so only one refresh of a given feed runs at a time."""
+    with _flights_guard:
+        return _flights.setdefault(name, threading.Lock())
 
-def update_cache_time(name: str):
-    _last_update[name] = datetime.datetime.utcnow()
+def memo_per_snapshot(key: str, snapshot, build):
+    """
+    Return build(snapshot), computed once per snapshot object.
+    Fetchers hand out the same cached object until their TTL refresh, so an
+    identity check is enough to know when derived structures must be rebuilt.
+    """
+    hit = _derived.get(key)
+    if hit is not None and hit[0] is snapshot:
+        return hit[1]
+    value = build(snapshot)
+    _derived[key] = (snapshot, value)
+    return value
 
 def _fmt_utc(dt: datetime.datetime) -> str:
     return dt.strftime("%Y-%m-%d %H:%M UTC")